@@ -0,0 +1,75 @@
+import math
+import threading
+from typing import Dict, Optional
+
+
+class StreamingHistogram:
+    """
+    Log-bucketed histogram for streaming quantiles.
+
+    Values fall into geometric buckets, so memory stays bounded no matter
+    how many samples are recorded and any quantile is accurate to within
+    the relative bucket width (about 5% with the default growth factor).
+    """
+
+    def __init__(self, growth: float = 1.1, min_value: float = 1e-3):
+        """
+        Args:
+            growth: Ratio between consecutive bucket bounds
+            min_value: Values at or below this land in the zero bucket
+        """
+        self.growth = growth
+        self.min_value = min_value
+        self._log_growth = math.log(growth)
+        self._buckets: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return -1
+        return int(math.log(value / self.min_value) / self._log_growth)
+
+    def _bucket_value(self, bucket: int) -> float:
+        """Geometric midpoint of a bucket"""
+        if bucket < 0:
+            return 0.0
+        return self.min_value * self.growth ** (bucket + 0.5)
+
+    def record(self, value: float):
+        with self._lock:
+            bucket = self._bucket(value)
+            self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the approximate q-quantile (0 <= q <= 1)"""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * (self.count - 1)
+            seen = 0
+            for bucket in sorted(self._buckets):
+                seen += self._buckets[bucket]
+                if seen > rank:
+                    # Never report outside the observed range
+                    return min(max(self._bucket_value(bucket), self.min), self.max)
+            return self.max
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Returns count, mean, min/max and p50/p95/p99"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Lower number = served first
+PURPOSE_PRIORITIES = {
+    "agent": 0,
+    "parameter_mapping": 1,
+    "analyze_dependencies": 1,
+    "check_missing_tools": 1,
+    "validate_arguments": 1,
+    "batch_validate_arguments": 1,
+    "email_generation": 2,
+    "email_generation_fallback": 2,
+    "conversation_compression": 3,
+    "title_generation": 4,
+}
+PRIORITY_NAMES = {
+    0: "interactive",
+    1: "planning",
+    2: "email",
+    3: "compression",
+    4: "title",
+}
+DEFAULT_PRIORITY = 2
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, floor: float = 0.0) -> float:
+        """
+        Takes `amount` from the bucket if that leaves at least `floor`.
+
+        Returns:
+            0 when the amount was taken, otherwise seconds until it could be
+        """
+        now = time.monotonic()
+        self._refill(now)
+        needed = min(amount + floor, self.capacity)
+        if self.level >= needed:
+            self.level -= amount
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def adjust(self, delta: float):
+        """Charges (or refunds, when negative) the bucket after the fact"""
+        self._refill(time.monotonic())
+        self.level = min(self.capacity, self.level - delta)
+
+
+@dataclass
+class Ticket:
+    """Handle for a granted request slot"""
+
+    model: str
+    priority: int
+    estimated_tokens: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class _Waiter:
+    __slots__ = ("priority", "loop", "future", "granted", "cancelled")
+
+    def __init__(self, priority: int, loop: asyncio.AbstractEventLoop):
+        self.priority = priority
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+        self.cancelled = False
+
+
+class LLMScheduler:
+    """
+    Priority-aware concurrency governor and rate limiter for outbound LLM
+    calls.
+
+    Requests queue by priority class (agent > planning/mapping > email >
+    compression > title) for a bounded number of in-flight slots, with a few
+    slots reserved for the interactive agent call. Optional per-model RPM/TPM
+    token buckets keep background classes from spending the last part of a
+    model's budget. Safe to share between event loops (title generation runs
+    in its own loop on a worker thread).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        interactive_reserve: int = 2,
+        model_budgets: Optional[Dict[str, Dict[str, float]]] = None,
+        default_rpm: Optional[float] = None,
+        default_tpm: Optional[float] = None,
+        background_headroom: float = 0.2,
+    ):
+        """
+        Args:
+            max_concurrency: Maximum concurrent outbound LLM requests
+            interactive_reserve: Slots only the interactive class may use
+            model_budgets: Per-model limits, e.g. {"openai/gpt-4o-mini":
+                {"rpm": 500, "tpm": 200000}}
+            default_rpm: Requests-per-minute limit for models without a budget
+            default_tpm: Tokens-per-minute limit for models without a budget
+            background_headroom: Fraction of each budget that email,
+                compression and title calls may not consume
+        """
+        self.max_concurrency = max_concurrency
+        self.interactive_reserve = min(interactive_reserve, max_concurrency - 1)
+        self.model_budgets = model_budgets or {}
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.background_headroom = background_headroom
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+
+        self._queued_by_class: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._max_queue_depth = 0
+        self._granted_by_class: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._wait_total_by_class: Dict[int, float] = {p: 0.0 for p in PRIORITY_NAMES}
+        self._wait_max_by_class: Dict[int, float] = {p: 0.0 for p in PRIORITY_NAMES}
+        self._rate_limited_by_model: Dict[str, int] = {}
+
+    def priority_for(self, purpose: Optional[str]) -> int:
+        return PURPOSE_PRIORITIES.get(purpose, DEFAULT_PRIORITY)
+
+    def _slot_limit(self, priority: int) -> int:
+        if priority == 0:
+            return self.max_concurrency
+        return self.max_concurrency - self.interactive_reserve
+
+    def _model_buckets(self, model: str) -> Dict[str, TokenBucket]:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            budget = self.model_budgets.get(model, {})
+            rpm = budget.get("rpm", self.default_rpm)
+            tpm = budget.get("tpm", self.default_tpm)
+            buckets = {}
+            if rpm:
+                buckets["rpm"] = TokenBucket(rpm)
+            if tpm:
+                buckets["tpm"] = TokenBucket(tpm)
+            self._buckets[model] = buckets
+        return buckets
+
+    def _reserve_budget(self, model: str, priority: int, tokens: int) -> float:
+        """Takes the model's RPM/TPM budget, or returns seconds to wait"""
+        headroom = self.background_headroom if priority >= 2 else 0.0
+        with self._lock:
+            buckets = self._model_buckets(model)
+            rpm, tpm = buckets.get("rpm"), buckets.get("tpm")
+            wait = 0.0
+            if rpm is not None:
+                wait = max(wait, rpm.reserve(1, rpm.capacity * headroom))
+            if tpm is not None and wait == 0.0:
+                wait = max(wait, tpm.reserve(tokens, tpm.capacity * headroom))
+                if wait > 0.0 and rpm is not None:
+                    rpm.adjust(-1)  # give the request back, we'll retry both
+            return wait
+
+    async def acquire(
+        self, model: str, purpose: Optional[str], estimated_tokens: int = 0
+    ) -> Ticket:
+        """Waits for rate budget and a concurrency slot for one request"""
+        priority = self.priority_for(purpose)
+        ticket = Ticket(model, priority, estimated_tokens)
+
+        while True:
+            wait = self._reserve_budget(model, priority, estimated_tokens)
+            if wait == 0.0:
+                break
+            with self._lock:
+                self._rate_limited_by_model[model] = (
+                    self._rate_limited_by_model.get(model, 0) + 1
+                )
+            await asyncio.sleep(min(wait, 5.0))
+
+        with self._lock:
+            while self._queue and self._queue[0][2].cancelled:
+                heapq.heappop(self._queue)
+            blocked_by_queue = bool(self._queue) and self._queue[0][0] <= priority
+            if not blocked_by_queue and self._in_flight < self._slot_limit(priority):
+                self._in_flight += 1
+                self._record_grant(ticket)
+                return ticket
+
+            waiter = _Waiter(priority, asyncio.get_running_loop())
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            self._queued_by_class[priority] = self._queued_by_class.get(priority, 0) + 1
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._in_flight -= 1
+                    self._dispatch()
+                else:
+                    waiter.cancelled = True
+                    self._queued_by_class[priority] -= 1
+            raise
+
+        with self._lock:
+            self._record_grant(ticket)
+        return ticket
+
+    def release(self, ticket: Ticket):
+        """Frees the ticket's slot and wakes the next eligible waiter"""
+        with self._lock:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def settle(self, ticket: Ticket, actual_tokens: int):
+        """Corrects the TPM charge with the tokens the provider reported"""
+        with self._lock:
+            tpm = self._model_buckets(ticket.model).get("tpm")
+            if tpm is not None:
+                tpm.adjust(actual_tokens - ticket.estimated_tokens)
+
+    def _dispatch(self):
+        """Hands free slots to the highest-priority waiters (lock held)"""
+        while self._queue:
+            priority, _, waiter = self._queue[0]
+            if waiter.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if self._in_flight >= self._slot_limit(priority):
+                break
+            heapq.heappop(self._queue)
+            self._queued_by_class[priority] -= 1
+            self._in_flight += 1
+            waiter.granted = True
+            waiter.loop.call_soon_threadsafe(self._wake, waiter.future)
+
+    @staticmethod
+    def _wake(future: asyncio.Future):
+        if not future.done():
+            future.set_result(None)
+
+    def _record_grant(self, ticket: Ticket):
+        waited = time.monotonic() - ticket.enqueued_at
+        priority = ticket.priority
+        self._granted_by_class[priority] = self._granted_by_class.get(priority, 0) + 1
+        self._wait_total_by_class[priority] = (
+            self._wait_total_by_class.get(priority, 0.0) + waited
+        )
+        self._wait_max_by_class[priority] = max(
+            self._wait_max_by_class.get(priority, 0.0), waited
+        )
+
+    def get_stats(self) -> Dict:
+        """Returns queue depth, in-flight and wait-time metrics per class"""
+        with self._lock:
+            by_class = {}
+            for priority, name in PRIORITY_NAMES.items():
+                granted = self._granted_by_class.get(priority, 0)
+                by_class[name] = {
+                    "queued": self._queued_by_class.get(priority, 0),
+                    "granted": granted,
+                    "avg_wait": (
+                        self._wait_total_by_class.get(priority, 0.0) / granted
+                        if granted
+                        else 0.0
+                    ),
+                    "max_wait": self._wait_max_by_class.get(priority, 0.0),
+                }
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "queue_depth": sum(self._queued_by_class.values()),
+                "max_queue_depth": self._max_queue_depth,
+                "by_class": by_class,
+                "rate_limited_waits": dict(self._rate_limited_by_model),
+            }
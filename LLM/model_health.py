@@ -0,0 +1,219 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request targets a model whose circuit is open"""
+
+
+@dataclass
+class HealthStats:
+    """Rolling health of one model (or model@provider)"""
+
+    latency_ewma: Optional[float] = None
+    error_rate: float = 0.0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    state: str = "closed"  # closed | open | half_open
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+
+
+class ModelHealthRegistry:
+    """
+    Tracks latency and error rate per model and provider, and runs a
+    circuit breaker per model so requests skip models that are known to be
+    down instead of waiting on them.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30.0,
+        alpha: float = 0.2,
+        degraded_error_rate: float = 0.5,
+        degraded_latency: float = 20.0,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open a model's circuit
+            cooldown_seconds: How long a circuit stays open before a probe
+            alpha: Smoothing factor for the latency and error-rate EWMAs
+            degraded_error_rate: Error rate above which a model is ranked last
+            degraded_latency: Latency EWMA (seconds) above which a model is
+                ranked after healthy ones
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.alpha = alpha
+        self.degraded_error_rate = degraded_error_rate
+        self.degraded_latency = degraded_latency
+        self._models: Dict[str, HealthStats] = {}
+        self._providers: Dict[str, HealthStats] = {}
+        self._lock = threading.Lock()
+
+    def _refresh_state(self, health: HealthStats, now: float):
+        if (
+            health.state == "open"
+            and now - health.opened_at >= self.cooldown_seconds
+        ):
+            health.state = "half_open"
+            health.probe_in_flight = False
+
+    def _update(self, health: HealthStats, ok: bool, latency: Optional[float]):
+        health.error_rate = (1 - self.alpha) * health.error_rate + self.alpha * (
+            0.0 if ok else 1.0
+        )
+        if latency is not None:
+            if health.latency_ewma is None:
+                health.latency_ewma = latency
+            else:
+                health.latency_ewma = (
+                    1 - self.alpha
+                ) * health.latency_ewma + self.alpha * latency
+        if ok:
+            health.successes += 1
+            health.consecutive_failures = 0
+        else:
+            health.failures += 1
+            health.consecutive_failures += 1
+
+    def is_available(self, model: str) -> bool:
+        """Whether a request to the model may be attempted (no side effects)"""
+        with self._lock:
+            health = self._models.get(model)
+            if health is None:
+                return True
+            self._refresh_state(health, time.time())
+            if health.state == "open":
+                return False
+            if health.state == "half_open":
+                return not health.probe_in_flight
+            return True
+
+    def acquire(self, model: str):
+        """
+        Claims permission to call a model, letting a single probe through
+        when the circuit is half-open.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a probe is running
+        """
+        with self._lock:
+            health = self._models.setdefault(model, HealthStats())
+            self._refresh_state(health, time.time())
+            if health.state == "open":
+                raise CircuitOpenError(f"Circuit open for {model}")
+            if health.state == "half_open":
+                if health.probe_in_flight:
+                    raise CircuitOpenError(f"Circuit half-open for {model}")
+                health.probe_in_flight = True
+
+    def release(self, model: str):
+        """Frees a half-open probe slot when a call is abandoned midway"""
+        with self._lock:
+            health = self._models.get(model)
+            if health is not None:
+                health.probe_in_flight = False
+
+    def record_success(
+        self, model: str, latency: float, provider: Optional[str] = None
+    ):
+        """Records a successful call and closes the model's circuit"""
+        with self._lock:
+            health = self._models.setdefault(model, HealthStats())
+            self._update(health, True, latency)
+            if health.state != "closed":
+                print(f"🟢 Circuit closed for {model}")
+            health.state = "closed"
+            health.probe_in_flight = False
+            if provider:
+                self._update(
+                    self._providers.setdefault(f"{model}@{provider}", HealthStats()),
+                    True,
+                    latency,
+                )
+
+    def record_failure(
+        self,
+        model: str,
+        latency: Optional[float] = None,
+        provider: Optional[str] = None,
+    ):
+        """Records a failed call, opening the circuit when over threshold"""
+        with self._lock:
+            health = self._models.setdefault(model, HealthStats())
+            self._update(health, False, latency)
+            if health.state == "half_open" or (
+                health.state == "closed"
+                and health.consecutive_failures >= self.failure_threshold
+            ):
+                health.state = "open"
+                health.opened_at = time.time()
+                health.probe_in_flight = False
+                print(
+                    f"🔴 Circuit opened for {model} after "
+                    f"{health.consecutive_failures} consecutive failures"
+                )
+            if provider:
+                self._update(
+                    self._providers.setdefault(f"{model}@{provider}", HealthStats()),
+                    False,
+                    latency,
+                )
+
+    def rank(self, models: List[str]) -> List[str]:
+        """
+        Drops models with an open circuit and moves degraded models behind
+        healthy ones, otherwise keeping the caller's preference order.
+        """
+
+        def tier(model: str) -> int:
+            health = self._models.get(model)
+            if health is None:
+                return 0
+            if health.state == "half_open":
+                return 3
+            if health.error_rate >= self.degraded_error_rate:
+                return 2
+            if (
+                health.latency_ewma is not None
+                and health.latency_ewma >= self.degraded_latency
+            ):
+                return 1
+            return 0
+
+        available = [model for model in models if self.is_available(model)]
+        with self._lock:
+            ranked = sorted(
+                available, key=lambda model: (tier(model), models.index(model))
+            )
+        skipped = [model for model in models if model not in available]
+        if skipped:
+            print(f"⚡ Skipping models with open circuits: {skipped}")
+        return ranked
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Returns per-model and per-provider health for monitoring"""
+
+        def describe(health: HealthStats) -> Dict:
+            return {
+                "state": health.state,
+                "latency_ewma": health.latency_ewma,
+                "error_rate": round(health.error_rate, 4),
+                "successes": health.successes,
+                "failures": health.failures,
+                "consecutive_failures": health.consecutive_failures,
+            }
+
+        with self._lock:
+            now = time.time()
+            for health in self._models.values():
+                self._refresh_state(health, now)
+            return {
+                "models": {m: describe(h) for m, h in self._models.items()},
+                "providers": {p: describe(h) for p, h in self._providers.items()},
+            }
@@ -5,10 +5,21 @@ import json
 import logging
 import time
 import asyncio
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+import copy
+import importlib.util
+import inspect
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Union
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
 from enum import Enum
 from mongo_client import MongoClient
+from LLM.histogram import StreamingHistogram
+from LLM.llm_scheduler import LLMScheduler
+from LLM.model_health import CircuitOpenError, ModelHealthRegistry
+from LLM.response_cache import ResponseCache, canonical_hash
+from LLM.token_budget import ContextBudgetError, TokenBudgeter
+from LLM.retry_policy import DEFAULT_RETRY_POLICIES, RetryPolicy, remaining_time
 
 
 class ResponseFormat(Enum):
@@ -25,6 +36,60 @@ class RequestStats:
     total_requests: int = 0
     total_tokens: int = 0
     total_errors: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    hedges_launched: int = 0
+    hedge_wins: int = 0
+    hedge_losses: int = 0
+    hedges_by_purpose: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    coalesced_requests: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    # (purpose, model) -> {"latency"|"prompt_tokens"|"completion_tokens": histogram}
+    histograms: Dict[tuple, Dict[str, StreamingHistogram]] = field(
+        default_factory=dict
+    )
+
+    def record(
+        self,
+        purpose: str,
+        model: str,
+        latency: float,
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+        cached_tokens: Optional[int] = None,
+    ):
+        """Adds one successful request to the purpose x model histograms"""
+        histograms = self.histograms.get((purpose, model))
+        if histograms is None:
+            histograms = self.histograms.setdefault(
+                (purpose, model),
+                {
+                    "latency": StreamingHistogram(),
+                    "prompt_tokens": StreamingHistogram(),
+                    "completion_tokens": StreamingHistogram(),
+                    "cached_tokens": StreamingHistogram(),
+                },
+            )
+        histograms["latency"].record(latency)
+        if prompt_tokens is not None:
+            histograms["prompt_tokens"].record(prompt_tokens)
+        if completion_tokens is not None:
+            histograms["completion_tokens"].record(completion_tokens)
+        if prompt_tokens:
+            self.prompt_tokens += prompt_tokens
+            self.cached_prompt_tokens += cached_tokens or 0
+            histograms["cached_tokens"].record(cached_tokens or 0)
+
+    def histogram_summary(self) -> Dict[str, Dict[str, Dict]]:
+        """Returns p50/p95/p99 summaries nested as purpose -> model -> metric"""
+        summary: Dict[str, Dict[str, Dict]] = {}
+        for (purpose, model), histograms in list(self.histograms.items()):
+            summary.setdefault(purpose, {})[model] = {
+                metric: histogram.summary()
+                for metric, histogram in histograms.items()
+            }
+        return summary
 
     @property
     def avg_tokens_per_request(self) -> float:
@@ -32,6 +97,35 @@ class RequestStats:
             self.total_tokens / self.total_requests if self.total_requests > 0 else 0.0
         )
 
+    @property
+    def prompt_cache_rate(self) -> float:
+        """Share of prompt tokens served from the provider's prompt cache"""
+        return (
+            self.cached_prompt_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        )
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups > 0 else 0.0
+
+
+# Purposes whose low-temperature responses are safe to reuse for identical inputs
+DEFAULT_CACHE_PURPOSES = frozenset(
+    {"parameter_mapping", "analyze_dependencies", "check_missing_tools"}
+)
+
+# Roughly 1024 tokens, the smallest prefix Anthropic will cache
+PROMPT_CACHE_MIN_CHARS = 4096
+
+# Attempts with less time than this left are not worth starting
+MIN_ATTEMPT_SECONDS = 0.5
+
+# Cheap internal calls where racing a fallback model is worth the extra tokens
+DEFAULT_HEDGE_PURPOSES = frozenset(
+    {"parameter_mapping", "analyze_dependencies", "check_missing_tools"}
+)
+
 
 class OpenRouterClient:
     """Client for OpenRouter API interactions with logging"""
@@ -44,6 +138,25 @@ class OpenRouterClient:
         enable_logging: bool = True,
         log_level: str = "INFO",
         mongo_logger: Optional[MongoClient] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 10.0,
+        default_timeout: float = 30.0,
+        http2: bool = False,
+        response_cache: Optional[ResponseCache] = None,
+        cache_purposes: Optional[set] = None,
+        coalesce_purposes: Optional[set] = None,
+        hedge_purposes: Optional[set] = None,
+        hedge_percentile: float = 0.95,
+        hedge_default_delay: float = 8.0,
+        hedge_min_delay: float = 0.5,
+        model_health: Optional[ModelHealthRegistry] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+        token_budgeter: Optional[TokenBudgeter] = None,
+        prompt_cache_hints: bool = True,
+        transport_factory: Optional[Callable[[], httpx.AsyncBaseTransport]] = None,
     ):
         """
         Initialize OpenRouter client
@@ -55,6 +168,31 @@ class OpenRouterClient:
             enable_logging: Whether to enable detailed logging
             log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
             mongo_logger: Optional MongoDB logger instance
+            max_connections: Maximum concurrent connections in the shared pool
+            max_keepalive_connections: Idle connections kept alive for reuse
+            keepalive_expiry: Seconds an idle connection stays in the pool
+            connect_timeout: Seconds allowed for establishing a connection
+            default_timeout: Read timeout used when a call does not pass one
+            http2: Negotiate HTTP/2 when the optional `h2` package is installed
+            response_cache: Optional cache for deterministic responses
+            cache_purposes: Purposes allowed to use the cache (defaults to the
+                low-temperature internal planning/mapping calls)
+            coalesce_purposes: Purposes whose identical concurrent requests
+                share a single upstream call (defaults to `cache_purposes`)
+            hedge_purposes: Purposes for which retries race fallback models
+            hedge_percentile: Latency percentile of a purpose after which the
+                next fallback model is launched in parallel
+            hedge_default_delay: Hedge delay used until enough latencies exist
+            hedge_min_delay: Lower bound for the hedge delay
+            model_health: Circuit breaker / health registry used to skip and
+                reorder unhealthy models
+            scheduler: Priority/rate-limit governor for outbound requests
+            retry_policies: Per-purpose retry policies, merged over the defaults
+            token_budgeter: Pre-flight prompt counter and context registry
+            prompt_cache_hints: Mark the system prompt with cache_control for
+                providers that need explicit prompt-caching breakpoints
+            transport_factory: Builds the httpx transport for each client
+                (e.g. record/replay); defaults to the network transport
         """
         self.api_key = api_key
         self.base_url = base_url
@@ -62,6 +200,51 @@ class OpenRouterClient:
         self.mongo_logger = mongo_logger
         self.stats = RequestStats()
 
+        # Shared connection pool, opened/closed by the application lifespan
+        self.pool_limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.connect_timeout = connect_timeout
+        self.default_timeout = default_timeout
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.transport_factory = transport_factory
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.response_cache = response_cache
+        self.cache_purposes = (
+            set(cache_purposes)
+            if cache_purposes is not None
+            else set(DEFAULT_CACHE_PURPOSES)
+        )
+        self.coalesce_purposes = (
+            set(coalesce_purposes)
+            if coalesce_purposes is not None
+            else set(self.cache_purposes)
+        )
+        self._in_flight: Dict[tuple, Dict[str, Any]] = {}
+
+        self.hedge_purposes = (
+            set(hedge_purposes)
+            if hedge_purposes is not None
+            else set(DEFAULT_HEDGE_PURPOSES)
+        )
+        self.hedge_percentile = hedge_percentile
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_min_delay = hedge_min_delay
+        # Recent successful latencies per purpose, used to size the hedge delay
+        self._purpose_latencies: Dict[str, deque] = defaultdict(
+            lambda: deque(maxlen=200)
+        )
+
+        self.model_health = model_health or ModelHealthRegistry()
+        self.scheduler = scheduler or LLMScheduler()
+        self.retry_policies = {**DEFAULT_RETRY_POLICIES, **(retry_policies or {})}
+        self.token_budgeter = token_budgeter or TokenBudgeter()
+        self.prompt_cache_hints = prompt_cache_hints
+
         # Setup logging - avoid duplicate handlers
         self.logger = logging.getLogger("OpenRouterClient")
         if enable_logging and not self.logger.handlers:
@@ -73,6 +256,69 @@ class OpenRouterClient:
             self.logger.addHandler(handler)
             self.logger.setLevel(getattr(logging, log_level.upper()))
 
+        if http2 and not self.http2:
+            self.logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+
+    def _new_http_client(self) -> httpx.AsyncClient:
+        """Creates an httpx client configured with the pool limits"""
+        return httpx.AsyncClient(
+            limits=self.pool_limits,
+            timeout=httpx.Timeout(self.default_timeout, connect=self.connect_timeout),
+            http2=self.http2,
+            transport=self.transport_factory() if self.transport_factory else None,
+        )
+
+    async def open(self):
+        """Opens the shared, keep-alive connection pool on the running event loop"""
+        if self._http_client is not None and not self._http_client.is_closed:
+            return
+        self._http_client = self._new_http_client()
+        self._http_client_loop = asyncio.get_running_loop()
+        self.logger.info(
+            f"🔌 Opened shared HTTP pool (max_connections={self.pool_limits.max_connections}, http2={self.http2})"
+        )
+
+    async def close(self):
+        """Closes the shared connection pool"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self.logger.info("🔌 Closed shared HTTP pool")
+        self._http_client = None
+        self._http_client_loop = None
+
+    def _get_shared_http_client(self) -> Optional[httpx.AsyncClient]:
+        """
+        Returns the shared client if it is open and bound to the current loop.
+
+        Calls made from another event loop (e.g. the background title thread
+        running `asyncio.run`) cannot reuse the pool and get None instead.
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            return None
+        try:
+            if asyncio.get_running_loop() is not self._http_client_loop:
+                return None
+        except RuntimeError:
+            return None
+        return self._http_client
+
+    @asynccontextmanager
+    async def _borrow_http_client(self):
+        """Yields the shared pooled client, or a short-lived one when unavailable"""
+        shared_client = self._get_shared_http_client()
+        if shared_client is not None:
+            yield shared_client
+        else:
+            async with self._new_http_client() as client:
+                yield client
+
+    def _request_timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        """Builds the per-request timeout"""
+        return httpx.Timeout(
+            timeout if timeout is not None else self.default_timeout,
+            connect=self.connect_timeout,
+        )
+
     async def chat_completion(
         self,
         session_id: str,
@@ -86,6 +332,10 @@ class OpenRouterClient:
         top_p: Optional[float] = None,
         timeout: Optional[int] = None,
         prefer_provider: Optional[str] = None,
+        stream: bool = False,
+        on_token: Optional[Callable[[str], Union[None, Awaitable[None]]]] = None,
+        use_cache: Optional[bool] = None,
+        coalesce: Optional[bool] = None,
         **kwargs,
     ) -> Dict[str, str]:
         """
@@ -101,14 +351,23 @@ class OpenRouterClient:
             top_p: Top-p sampling parameter (0.0-1.0)
             timeout: Optional[int] = None,
             prefer_provider: Preferred provider for the model
+            stream: Stream the completion and assemble it incrementally
+            on_token: Callback (sync or async) invoked with each content delta
+                when streaming
+            use_cache: Force the response cache on/off (defaults to whether the
+                purpose is in `cache_purposes`)
+            coalesce: Force sharing of identical in-flight requests on/off
+                (defaults to whether the purpose is in `coalesce_purposes`)
             **kwargs: Additional parameters to pass to the API
 
         Returns:
-            Dict containing the API response
+            Dict containing the API response (streamed responses are assembled
+            into the same shape as a non-streamed one)
 
         Raises:
             requests.RequestException: For network errors
             ValueError: For invalid responses
+            ContextBudgetError: If the prompt cannot fit the model's context
         """
         request_id = str(uuid.uuid4())
 
@@ -134,6 +393,30 @@ class OpenRouterClient:
             for message in messages
         ]
 
+        # Pre-flight: count the prompt locally and size the completion so
+        # requests that cannot fit never leave the process
+        token_plan = self.token_budgeter.plan(
+            model, sanitized_messages, tools, max_tokens
+        )
+        if not token_plan.fits:
+            self.logger.error(
+                f"📏 {purpose} prompt (~{token_plan.prompt_tokens} tokens) does not fit {model}"
+            )
+            raise ContextBudgetError(
+                model,
+                token_plan.prompt_tokens,
+                self.token_budgeter.limits_for(model).context_window,
+            )
+        if token_plan.max_tokens != max_tokens:
+            self.logger.debug(
+                f"📏 max_tokens for {model} sized to {token_plan.max_tokens} "
+                f"(prompt ~{token_plan.prompt_tokens} tokens)"
+            )
+        max_tokens = token_plan.max_tokens
+
+        if self.prompt_cache_hints:
+            sanitized_messages = self._add_cache_breakpoints(model, sanitized_messages)
+
         # Build request payload - only include non-None values
         request_payload = {"model": model, "messages": sanitized_messages, **kwargs}
 
@@ -148,6 +431,151 @@ class OpenRouterClient:
             request_payload["tools"] = tools
         if response_format == ResponseFormat.JSON:
             request_payload["response_format"] = {"type": "json_object"}
+        if stream:
+            request_payload["stream"] = True
+            request_payload["stream_options"] = {"include_usage": True}
+
+        # Serve repeated deterministic calls from the response cache
+        cache_key = None
+        if self._should_use_cache(purpose, stream, use_cache):
+            cache_key = canonical_hash(request_payload)
+            cached_result = self.response_cache.get(cache_key)
+            if cached_result is not None:
+                self.stats.cache_hits += 1
+                self.logger.info(f"💾 Cache hit for {purpose} on {model}")
+                return cached_result
+            self.stats.cache_misses += 1
+
+        # Identical requests already in flight share one upstream call
+        if self._should_coalesce(purpose, stream, coalesce):
+            flight_key = cache_key or canonical_hash(request_payload)
+            return await self._coalesce(
+                flight_key,
+                lambda: self._send_completion(
+                    request_id,
+                    session_id,
+                    purpose,
+                    model,
+                    messages,
+                    request_payload,
+                    max_tokens,
+                    timeout,
+                    prefer_provider,
+                    stream,
+                    on_token,
+                    cache_key,
+                    token_plan.prompt_tokens,
+                ),
+            )
+
+        return await self._send_completion(
+            request_id,
+            session_id,
+            purpose,
+            model,
+            messages,
+            request_payload,
+            max_tokens,
+            timeout,
+            prefer_provider,
+            stream,
+            on_token,
+            cache_key,
+            token_plan.prompt_tokens,
+        )
+
+    def _add_cache_breakpoints(
+        self, model: str, messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Anthropic only caches prompt prefixes up to an explicit cache_control
+        breakpoint. Marks the leading system prompt (tools + system form the
+        cached prefix); other providers cache prefixes automatically.
+        """
+        if not model.startswith("anthropic/") or not messages:
+            return messages
+        first = messages[0]
+        content = first.get("content")
+        if first.get("role") != "system" or not isinstance(content, str):
+            return messages
+        # Anthropic ignores breakpoints on prefixes below ~1024 tokens
+        if len(content) < PROMPT_CACHE_MIN_CHARS:
+            return messages
+        marked = {
+            **first,
+            "content": [
+                {
+                    "type": "text",
+                    "text": content,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+        }
+        return [marked, *messages[1:]]
+
+    def _should_coalesce(
+        self, purpose: str, stream: bool, coalesce: Optional[bool]
+    ) -> bool:
+        """Decides whether identical concurrent calls may share one request"""
+        if stream:
+            return False
+        if coalesce is not None:
+            return coalesce
+        return purpose in self.coalesce_purposes
+
+    async def _coalesce(
+        self, flight_key: str, send: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Singleflight: the first caller for a key starts the request, later
+        callers await the same task. The task is cancelled only when every
+        caller waiting on it has been cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        key = (id(loop), flight_key)
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = {"task": loop.create_task(send()), "waiters": 0}
+            self._in_flight[key] = flight
+
+            def _forget(_task, key=key, flight=flight):
+                if self._in_flight.get(key) is flight:
+                    del self._in_flight[key]
+
+            flight["task"].add_done_callback(_forget)
+        else:
+            self.stats.coalesced_requests += 1
+            self.logger.info(f"🔗 Coalesced identical in-flight request {flight_key[:8]}")
+
+        flight["waiters"] += 1
+        try:
+            result = await asyncio.shield(flight["task"])
+            # Each caller gets its own copy; callers mutate responses
+            return copy.deepcopy(result) if flight["waiters"] > 1 else result
+        finally:
+            flight["waiters"] -= 1
+            if flight["waiters"] == 0 and not flight["task"].done():
+                flight["task"].cancel()
+
+    async def _send_completion(
+        self,
+        request_id: str,
+        session_id: str,
+        purpose: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        request_payload: Dict[str, Any],
+        max_tokens: Optional[int],
+        timeout: Optional[int],
+        prefer_provider: Optional[str],
+        stream: bool,
+        on_token: Optional[Callable[[str], Union[None, Awaitable[None]]]],
+        cache_key: Optional[str],
+        predicted_prompt_tokens: int,
+    ) -> Dict[str, Any]:
+        """Sends a built request payload and records the outcome"""
+        # Fail fast on models we already know are down
+        self.model_health.acquire(model)
 
         # Build headers
         headers = {
@@ -162,17 +590,54 @@ class OpenRouterClient:
         # Log and make request
         self._log_request(model, purpose, messages, request_payload, request_id)
 
+        # Prompt + completion size until the provider reports usage
+        estimated_tokens = predicted_prompt_tokens + (max_tokens or 0)
+
+        ticket = None
+        response_text = None
         start_time = time.time()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.base_url,
-                    headers=headers,
-                    json=request_payload,
-                    timeout=timeout if timeout is not None else 30,
-                )
-                print(f"response {response.text}")
-                response.raise_for_status()
+            ticket = await self.scheduler.acquire(model, purpose, estimated_tokens)
+            start_time = time.time()
+            async with self._borrow_http_client() as client:
+                if stream:
+                    result = await self._stream_completion(
+                        client, headers, request_payload, timeout, on_token
+                    )
+                    response_text = json.dumps(result)
+                else:
+                    response = await client.post(
+                        self.base_url,
+                        headers=headers,
+                        json=request_payload,
+                        timeout=self._request_timeout(timeout),
+                    )
+                    response_text = response.text
+                    print(f"response {response.text}")
+                    response.raise_for_status()
+
+        except asyncio.CancelledError:
+            # Outside cancellation (hedge loser, client disconnect) says
+            # nothing about the model; attempt timeouts are recorded by
+            # chat_completion_with_retries
+            self.model_health.release(model)
+            raise
+
+        except httpx.HTTPStatusError as e:
+            elapsed_time = time.time() - start_time
+            self.logger.error(f"HTTP Status Error: {e}")
+            self._log_error(
+                model,
+                session_id,
+                e,
+                elapsed_time,
+                request_id,
+                request_payload,
+                response_text,
+            )
+            self.stats.total_errors += 1
+            self.model_health.record_failure(model, elapsed_time)
+            raise
 
         except httpx.RequestError as e:
             elapsed_time = time.time() - start_time
@@ -181,11 +646,22 @@ class OpenRouterClient:
                 model, session_id, e, elapsed_time, request_id, request_payload
             )
             self.stats.total_errors += 1
+            self.model_health.record_failure(model, elapsed_time)
+            raise
+
+        except Exception:
+            # No outcome recorded; don't leave a half-open probe claimed
+            self.model_health.release(model)
             raise
 
+        finally:
+            if ticket is not None:
+                self.scheduler.release(ticket)
+
         # Parse response
         try:
-            result = response.json()
+            if not stream:
+                result = response.json()
 
             # Check for OpenRouter error format
             if "error" in result:
@@ -210,9 +686,12 @@ class OpenRouterClient:
                     elapsed_time,
                     request_id,
                     request_payload,
-                    response.text,
+                    response_text,
                 )
                 self.stats.total_errors += 1
+                self.model_health.record_failure(
+                    model, elapsed_time, result.get("provider")
+                )
                 raise ValueError(f"API error: {error_message}")
 
         except json.JSONDecodeError as e:
@@ -224,11 +703,16 @@ class OpenRouterClient:
                 elapsed_time,
                 request_id,
                 request_payload,
-                response.text,
+                response_text,
             )
             self.stats.total_errors += 1
+            self.model_health.record_failure(model, elapsed_time)
             raise ValueError(f"Invalid JSON response: {e}")
 
+        except Exception:
+            self.model_health.release(model)
+            raise
+
         # Log response and update stats
         elapsed_time = time.time() - start_time
         self._log_response(
@@ -242,9 +726,138 @@ class OpenRouterClient:
         )
 
         self.stats.total_requests += 1
+        usage = result.get("usage") or {}
         if "usage" in result:
             self.stats.total_tokens += result["usage"].get("total_tokens", 0)
+            self.scheduler.settle(ticket, result["usage"].get("total_tokens", 0))
+        self.stats.record(
+            purpose,
+            model,
+            elapsed_time,
+            usage.get("prompt_tokens"),
+            usage.get("completion_tokens"),
+            (usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+        )
+        self.token_budgeter.record_usage(
+            purpose, model, predicted_prompt_tokens, usage.get("prompt_tokens")
+        )
+        self._purpose_latencies[purpose].append(elapsed_time)
+        self.model_health.record_success(model, elapsed_time, result.get("provider"))
+
+        if cache_key is not None:
+            self.response_cache.set(cache_key, result)
+
+        return result
+
+    def _should_use_cache(
+        self, purpose: str, stream: bool, use_cache: Optional[bool]
+    ) -> bool:
+        """Decides whether a call may be served from / stored in the cache"""
+        if self.response_cache is None or stream:
+            return False
+        if use_cache is not None:
+            return use_cache
+        return purpose in self.cache_purposes
+
+    async def _stream_completion(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        request_payload: Dict,
+        timeout: Optional[float],
+        on_token: Optional[Callable[[str], Union[None, Awaitable[None]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Streams a completion over SSE and assembles it into a regular response.
+
+        Content deltas are forwarded to `on_token` as they arrive; tool call
+        deltas are merged by index until the stream ends.
+        """
+        content_parts: List[str] = []
+        tool_calls: Dict[int, Dict] = {}
+        result: Dict[str, Any] = {}
+        finish_reason = None
+
+        async with client.stream(
+            "POST",
+            self.base_url,
+            headers=headers,
+            json=request_payload,
+            timeout=self._request_timeout(timeout),
+        ) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                # Skip keep-alive comments (": OPENROUTER PROCESSING") and blanks
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
 
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    self.logger.debug(f"Skipping malformed stream chunk: {data[:100]}")
+                    continue
+
+                if "error" in chunk:
+                    # Surface mid-stream errors through the regular error path
+                    return {"error": chunk["error"]}
+
+                for key in ("id", "model", "provider", "created"):
+                    if key in chunk:
+                        result[key] = chunk[key]
+                if chunk.get("usage"):
+                    result["usage"] = chunk["usage"]
+
+                for choice in chunk.get("choices") or []:
+                    delta = choice.get("delta") or {}
+                    if choice.get("finish_reason"):
+                        finish_reason = choice["finish_reason"]
+
+                    token = delta.get("content")
+                    if token:
+                        content_parts.append(token)
+                        if on_token is not None:
+                            callback_result = on_token(token)
+                            if inspect.isawaitable(callback_result):
+                                await callback_result
+
+                    for tool_call_delta in delta.get("tool_calls") or []:
+                        index = tool_call_delta.get("index", len(tool_calls))
+                        tool_call = tool_calls.setdefault(
+                            index,
+                            {
+                                "id": None,
+                                "type": "function",
+                                "function": {"name": "", "arguments": ""},
+                            },
+                        )
+                        if tool_call_delta.get("id"):
+                            tool_call["id"] = tool_call_delta["id"]
+                        if tool_call_delta.get("type"):
+                            tool_call["type"] = tool_call_delta["type"]
+                        function_delta = tool_call_delta.get("function") or {}
+                        if function_delta.get("name"):
+                            tool_call["function"]["name"] += function_delta["name"]
+                        if function_delta.get("arguments"):
+                            tool_call["function"]["arguments"] += function_delta[
+                                "arguments"
+                            ]
+
+        message: Dict[str, Any] = {
+            "role": "assistant",
+            "content": "".join(content_parts),
+        }
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+
+        result["choices"] = [
+            {"index": 0, "message": message, "finish_reason": finish_reason}
+        ]
         return result
 
     async def chat_completion_with_retries(
@@ -253,56 +866,287 @@ class OpenRouterClient:
         purpose: str,
         messages: List[Dict[str, str]],
         model_fallbacks: Optional[List[str]] = None,
-        max_retries: int = 3,
-        backoff_factor: float = 2.0,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        hedge: Optional[bool] = None,
+        retry_policy: Optional[RetryPolicy] = None,
         **kwargs,
     ) -> Optional[Dict[str, str]]:
         """
         Attempt chat completion with retries and model fallbacks
 
+        The purpose's RetryPolicy supplies the models, attempts, per-attempt
+        timeout and total budget; explicit arguments override it. No attempt
+        outlives the budget or the deadline of the HTTP request being served.
+
         Args:
             messages: List of message dictionaries
             model_fallbacks: Ordered list of models to try (includes primary model)
-            max_retries: Maximum retries per model
+            max_retries: Maximum attempts per model (defaults to the purpose's
+                policy, 3 when it sets none)
             backoff_factor: Exponential backoff multiplier
+            hedge: Race fallback models instead of walking them one by one
+                (defaults to whether the purpose is in `hedge_purposes`)
+            retry_policy: Policy to use instead of the purpose's default
             **kwargs: Additional parameters for chat_completion
 
         Returns:
             Dict containing the API response, or None if all attempts fail
         """
-        models_to_try = model_fallbacks
+        kwargs = self._filter_completion_kwargs(purpose, kwargs)
+        policy = (
+            retry_policy or self.retry_policies.get(purpose) or RetryPolicy()
+        ).with_overrides(
+            fallbacks=model_fallbacks,
+            attempts_per_model=max_retries,
+            backoff_factor=backoff_factor,
+            attempt_timeout=kwargs.pop("timeout", None),
+        )
+
+        models_to_try = list(policy.fallbacks)
+        if not models_to_try:
+            self.logger.error(f"No models configured for {purpose}")
+            return None
+        models_to_try = self.model_health.rank(models_to_try)
+        if not models_to_try:
+            self.logger.error("All fallback models have open circuits")
+            return None
+
+        budget_deadline = (
+            time.monotonic() + policy.total_budget
+            if policy.total_budget is not None
+            else None
+        )
+
+        def time_left() -> Optional[float]:
+            limits = [remaining_time()]
+            if budget_deadline is not None:
+                limits.append(budget_deadline - time.monotonic())
+            limits = [limit for limit in limits if limit is not None]
+            return min(limits) if limits else None
+
+        def attempt_timeout() -> Optional[float]:
+            left = time_left()
+            if left is None:
+                return policy.attempt_timeout
+            if policy.attempt_timeout is None:
+                return left
+            return min(policy.attempt_timeout, left)
+
+        if hedge is None:
+            hedge = purpose in self.hedge_purposes
+        if hedge and len(models_to_try) > 1:
+            left = time_left()
+            try:
+                return await asyncio.wait_for(
+                    self._hedged_completion(
+                        session_id,
+                        purpose,
+                        messages,
+                        models_to_try,
+                        timeout=policy.attempt_timeout,
+                        **kwargs,
+                    ),
+                    timeout=left if left is None else max(left, 0.0),
+                )
+            except asyncio.TimeoutError:
+                self.logger.error(f"⏰ {purpose} ran out of time budget")
+                return None
 
         for model in models_to_try:
-            for attempt in range(max_retries):
+            for attempt in range(policy.attempts_per_model):
+                timeout = attempt_timeout()
+                if timeout is not None and timeout < MIN_ATTEMPT_SECONDS:
+                    self.logger.error(
+                        f"⏰ {purpose} ran out of time budget before trying {model}"
+                    )
+                    return None
+
                 try:
                     self.logger.info(
-                        f"Trying {model} (attempt {attempt + 1}/{max_retries})"
+                        f"Trying {model} (attempt {attempt + 1}/{policy.attempts_per_model})"
                     )
 
-                    result = await self.chat_completion(
-                        messages=messages,
-                        purpose=purpose,
-                        session_id=session_id,
-                        model=model,
-                        **kwargs,
+                    attempt_start = time.time()
+                    result = await asyncio.wait_for(
+                        self.chat_completion(
+                            messages=messages,
+                            purpose=purpose,
+                            session_id=session_id,
+                            model=model,
+                            timeout=timeout,
+                            **kwargs,
+                        ),
+                        timeout=timeout,
                     )
 
                     self.logger.info(f"✅ Success with {model}")
                     return result
 
+                except CircuitOpenError as e:
+                    # No point backing off on a model we know is down
+                    self.logger.warning(f"⚡ {str(e)}, moving to next model")
+                    break
+
+                except ContextBudgetError as e:
+                    # Retrying the same model cannot help; a fallback might
+                    self.logger.warning(f"📏 {str(e)}, moving to next model")
+                    break
+
+                except asyncio.TimeoutError:
+                    self.logger.warning(
+                        f"⏰ {model} timed out after {timeout:.1f}s (attempt {attempt + 1})"
+                    )
+                    # The cancelled attempt only released the model; a hang
+                    # is exactly what the breaker and latency EWMA must see
+                    self.stats.total_errors += 1
+                    self.model_health.record_failure(
+                        model, time.time() - attempt_start
+                    )
+                    # A slow model is unlikely to speed up on an immediate retry
+                    break
+
                 except Exception as e:
                     self.logger.warning(
                         f"❌ {model} failed (attempt {attempt + 1}): {str(e)}"
                     )
 
-                    if attempt < max_retries - 1:
-                        sleep_time = backoff_factor**attempt
+                    if attempt < policy.attempts_per_model - 1:
+                        sleep_time = min(
+                            policy.backoff_factor**attempt, policy.max_backoff
+                        )
+                        left = time_left()
+                        if left is not None:
+                            sleep_time = min(sleep_time, max(left, 0.0))
                         self.logger.info(f"Retrying in {sleep_time:.1f}s...")
                         await asyncio.sleep(sleep_time)
 
         self.logger.error("All models and retries exhausted")
         return None
 
+    def _filter_completion_kwargs(
+        self, purpose: str, kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Drops retry knobs that are not chat_completion parameters so they
+        never leak into the API payload.
+        """
+        accepted = {}
+        for key, value in kwargs.items():
+            if key in CHAT_COMPLETION_OPTIONS:
+                accepted[key] = value
+            else:
+                self.logger.warning(
+                    f"Ignoring unsupported retry argument '{key}' for {purpose}"
+                )
+        return accepted
+
+    def _hedge_delay(self, purpose: str) -> float:
+        """Seconds to wait on in-flight models before launching the next one"""
+        latencies = self._purpose_latencies.get(purpose)
+        if not latencies or len(latencies) < 10:
+            return self.hedge_default_delay
+        ordered = sorted(latencies)
+        index = min(int(len(ordered) * self.hedge_percentile), len(ordered) - 1)
+        return max(ordered[index], self.hedge_min_delay)
+
+    def _record_hedge(self, purpose: str, outcome: str):
+        """Counts hedge launches/wins/losses in total and per purpose"""
+        if outcome == "launched":
+            self.stats.hedges_launched += 1
+        elif outcome == "win":
+            self.stats.hedge_wins += 1
+        elif outcome == "loss":
+            self.stats.hedge_losses += 1
+        purpose_stats = self.stats.hedges_by_purpose.setdefault(
+            purpose, {"launched": 0, "win": 0, "loss": 0}
+        )
+        purpose_stats[outcome] += 1
+
+    async def _hedged_completion(
+        self,
+        session_id: str,
+        purpose: str,
+        messages: List[Dict[str, str]],
+        models: List[str],
+        **kwargs,
+    ) -> Optional[Dict[str, str]]:
+        """
+        Runs the fallback chain as a hedged race.
+
+        The primary model starts alone. If nothing has answered within the
+        purpose's latency percentile, the next model is launched alongside it;
+        a failure launches the next model immediately. The first valid answer
+        wins and every other in-flight request is cancelled.
+        """
+        hedge_delay = self._hedge_delay(purpose)
+        pending: Dict[asyncio.Task, str] = {}
+        hedge_tasks = set()
+        next_index = 0
+
+        def launch(is_hedge: bool = False):
+            nonlocal next_index
+            model = models[next_index]
+            next_index += 1
+            self.logger.info(
+                f"Trying {model} ({'hedge' if is_hedge else 'attempt'} {next_index}/{len(models)})"
+            )
+            task = asyncio.create_task(
+                self.chat_completion(
+                    messages=messages,
+                    purpose=purpose,
+                    session_id=session_id,
+                    model=model,
+                    **kwargs,
+                )
+            )
+            pending[task] = model
+            if is_hedge:
+                hedge_tasks.add(task)
+                self._record_hedge(purpose, "launched")
+
+        launch()
+        try:
+            while pending:
+                can_hedge = next_index < len(models)
+                done, _ = await asyncio.wait(
+                    pending.keys(),
+                    timeout=hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    self.logger.info(
+                        f"⏱️ No answer from {list(pending.values())} within {hedge_delay:.2f}s, hedging"
+                    )
+                    launch(is_hedge=True)
+                    continue
+
+                for task in done:
+                    model = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self.logger.warning(f"❌ {model} failed: {str(e)}")
+                        continue
+
+                    if hedge_tasks:
+                        self._record_hedge(
+                            purpose, "win" if task in hedge_tasks else "loss"
+                        )
+                    self.logger.info(f"✅ Success with {model}")
+                    return result
+
+                # Everything that finished failed; fail over without waiting
+                if next_index < len(models):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.logger.error("All hedged models exhausted")
+        return None
+
     def extract_content(self, response: Dict[str, str]) -> str:
         """Extract content from OpenRouter response"""
         try:
@@ -334,6 +1178,28 @@ class OpenRouterClient:
                 if self.stats.total_requests > 0
                 else 0.0
             ),
+            "cache_hits": self.stats.cache_hits,
+            "cache_misses": self.stats.cache_misses,
+            "cache_hit_rate": self.stats.cache_hit_rate,
+            "coalesced_requests": self.stats.coalesced_requests,
+            "prompt_tokens": self.stats.prompt_tokens,
+            "cached_prompt_tokens": self.stats.cached_prompt_tokens,
+            "prompt_cache_rate": self.stats.prompt_cache_rate,
+            "in_flight_requests": len(self._in_flight),
+            "histograms": self.stats.histogram_summary(),
+            "token_budget": self.token_budgeter.get_stats(),
+            "model_health": self.model_health.snapshot(),
+            "scheduler": self.scheduler.get_stats(),
+            "hedging": {
+                "launched": self.stats.hedges_launched,
+                "wins": self.stats.hedge_wins,
+                "losses": self.stats.hedge_losses,
+                "by_purpose": self.stats.hedges_by_purpose,
+                "current_delays": {
+                    purpose: self._hedge_delay(purpose)
+                    for purpose in self.hedge_purposes
+                },
+            },
         }
 
     def reset_stats(self):
@@ -550,3 +1416,9 @@ class OpenRouterClient:
                 "successful": False,
             }
             self.mongo_logger.log_llm_request(log_data)
+
+
+# Keyword arguments chat_completion_with_retries passes through per attempt
+CHAT_COMPLETION_OPTIONS = frozenset(
+    inspect.signature(OpenRouterClient.chat_completion).parameters
+) - {"self", "session_id", "purpose", "messages", "model", "kwargs"}
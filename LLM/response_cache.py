@@ -0,0 +1,94 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import diskcache
+except ImportError:  # diskcache is optional; the memory tier works without it
+    diskcache = None
+
+
+def canonical_hash(payload: Any) -> str:
+    """Returns a stable SHA-256 hash of a JSON-serializable payload"""
+    canonical = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM responses: an in-memory LRU with TTL in front of
+    an optional on-disk diskcache store shared across restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+        disk_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            ttl_seconds: Time-to-live for cached responses in both tiers
+            disk_path: Directory for the on-disk tier (disabled when None)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            if diskcache is None:
+                print("⚠️ diskcache not installed, LLM response cache is memory-only")
+            else:
+                self._disk = diskcache.Cache(disk_path)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Returns a copy of the cached response, or None on miss/expiry"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+        if self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                # Promote to the memory tier
+                self._set_memory(key, value, now)
+                return copy.deepcopy(value)
+
+        return None
+
+    def set(self, key: str, value: Dict):
+        """Stores a response in both tiers"""
+        self._set_memory(key, copy.deepcopy(value), time.time())
+        if self._disk is not None:
+            self._disk.set(key, value, expire=self.ttl_seconds)
+
+    def _set_memory(self, key: str, value: Dict, now: float):
+        with self._lock:
+            self._memory[key] = (now + self.ttl_seconds, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drops all cached responses"""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def __len__(self) -> int:
+        return len(self._memory)
@@ -0,0 +1,109 @@
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How an LLM purpose retries: which models, how often, how long"""
+
+    fallbacks: Tuple[str, ...] = ()
+    attempts_per_model: int = 3
+    attempt_timeout: Optional[float] = None
+    total_budget: Optional[float] = None
+    backoff_factor: float = 2.0
+    max_backoff: float = 4.0
+
+    def with_overrides(self, **changes) -> "RetryPolicy":
+        """Returns a copy with the non-None `changes` applied"""
+        changes = {key: value for key, value in changes.items() if value is not None}
+        if "fallbacks" in changes:
+            changes["fallbacks"] = tuple(changes["fallbacks"])
+        return replace(self, **changes)
+
+
+# Per-purpose policies; call sites rely on these rather than passing their own
+DEFAULT_RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    "parameter_mapping": RetryPolicy(
+        fallbacks=("openai/gpt-4o-mini", "anthropic/claude-3.5-sonnet"),
+        attempts_per_model=1,
+        attempt_timeout=20.0,
+        total_budget=40.0,
+    ),
+    "analyze_dependencies": RetryPolicy(
+        fallbacks=("openai/gpt-4o-mini", "qwen/qwen3-235b-a22b"),
+        attempts_per_model=1,
+        attempt_timeout=20.0,
+        total_budget=40.0,
+    ),
+    "check_missing_tools": RetryPolicy(
+        fallbacks=(
+            "anthropic/claude-3.5-sonnet",
+            "qwen/qwen3-235b-a22b",
+            "openai/gpt-4o",
+            "openai/gpt-4o-mini",
+        ),
+        attempts_per_model=1,
+        attempt_timeout=20.0,
+        total_budget=45.0,
+    ),
+    "validate_arguments": RetryPolicy(
+        fallbacks=("openai/gpt-4o-mini", "mistralai/mistral-small-3.2-24b-instruct"),
+        attempts_per_model=1,
+        attempt_timeout=15.0,
+        total_budget=30.0,
+    ),
+    "batch_validate_arguments": RetryPolicy(
+        fallbacks=(
+            "mistralai/mistral-small-3.2-24b-instruct",
+            "anthropic/claude-3-haiku",
+        ),
+        attempts_per_model=2,
+        attempt_timeout=20.0,
+        total_budget=45.0,
+    ),
+    "email_generation_fallback": RetryPolicy(
+        fallbacks=(
+            "openai/gpt-4o-mini",
+            "anthropic/claude-3-haiku",
+            "google/gemini-flash-1.5",
+        ),
+        attempts_per_model=2,
+        attempt_timeout=45.0,
+        total_budget=90.0,
+    ),
+    "title_generation": RetryPolicy(
+        fallbacks=(
+            "cohere/command-r-08-2024",
+            "mistralai/mistral-7b-instruct",
+            "openai/gpt-3.5-turbo",
+        ),
+        attempts_per_model=2,
+        attempt_timeout=10.0,
+        total_budget=30.0,
+    ),
+}
+
+
+# Monotonic deadline of the HTTP request currently being served, if any
+_request_deadline: ContextVar[Optional[float]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+def set_request_deadline(seconds: float) -> Token:
+    """Sets the deadline for work done in the current context"""
+    return _request_deadline.set(time.monotonic() + seconds)
+
+
+def reset_request_deadline(token: Token):
+    _request_deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request deadline (None if unbounded)"""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
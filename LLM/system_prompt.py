@@ -1,6 +1,14 @@
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict
 
-current_time = datetime.now().strftime("%A, %B %d, %Y at %I:%M %p")
+CURRENT_TIME_FORMAT = "%A, %B %d, %Y at %I:%M %p"
+current_time = datetime.now().strftime(CURRENT_TIME_FORMAT)
+
+# The system prompt must stay byte-identical across turns so providers can
+# cache it; the live date/time is sent in a trailing session context message
+SESSION_CONTEXT_REFERENCE = "given in the latest session context message"
+SESSION_CONTEXT_HEADER = "SESSION CONTEXT:"
 openai_prompt_template = """
 ROLE AND IDENTITY:
 You are Ava, an expert AI Sales Development Assistant with advanced capabilities in:
@@ -1873,10 +1881,15 @@ Please provide these details so I can create an effective email for you."
 """
 
 
+@lru_cache(maxsize=None)
 def get_model_specific_prompt(model: str) -> str:
     """
     Returns model-specific system prompt based on the model provider.
 
+    The prompt contains no per-call data, so repeated calls return the exact
+    same string and the provider can serve it from its prompt cache. Pair it
+    with `get_session_context_message()` for the current date and time.
+
     Args:
         model: The model identifier (e.g., "openai/gpt-4", "anthropic/claude-3")
 
@@ -1885,17 +1898,56 @@ def get_model_specific_prompt(model: str) -> str:
     """
     model = model.lower()
     print(f"Check model for getting system prompt {model}")
-    base_prompt = system_prompt_template.replace("{{current_time}}", current_time)
+    base_prompt = system_prompt_template.replace(
+        "{{current_time}}", SESSION_CONTEXT_REFERENCE
+    )
     if model in ["openai/gpt-4o"]:
         print("Using OpenAI GPT-4o model")
-        return openai_prompt_template.replace("{{current_time}}", current_time)
+        return openai_prompt_template.replace(
+            "{{current_time}}", SESSION_CONTEXT_REFERENCE
+        )
     elif model in ["anthropic/claude-sonnet-4", "claude"]:
         print("Using Anthropic Claude Sonnet 4 model")
-        return claude_prompt_template.replace("{{current_time}}", current_time)
+        return claude_prompt_template.replace(
+            "{{current_time}}", SESSION_CONTEXT_REFERENCE
+        )
 
     # Default prompt for other models
     else:
         return base_prompt
 
 
+def get_session_context_message() -> Dict[str, str]:
+    """
+    Returns the volatile per-turn context (current date and time) as a
+    separate system message, meant to go right before the latest user
+    message so the system prompt and earlier history stay byte-stable.
+    """
+    now = datetime.now().strftime(CURRENT_TIME_FORMAT)
+    return {
+        "role": "system",
+        "content": f"{SESSION_CONTEXT_HEADER}\n**Current Date and Time:** {now}",
+    }
+
+
+def strip_session_context(payload: Any) -> Any:
+    """
+    Drops session context messages from a chat payload, e.g. so recorded
+    requests still match on replay at a different time.
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get("messages"), list):
+        return payload
+    return {
+        **payload,
+        "messages": [
+            message
+            for message in payload["messages"]
+            if not (
+                message.get("role") == "system"
+                and str(message.get("content", "")).startswith(SESSION_CONTEXT_HEADER)
+            )
+        ],
+    }
+
+
 system_prompt = system_prompt_template.replace("{{current_time}}", current_time)
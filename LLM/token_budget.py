@@ -0,0 +1,211 @@
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # fall back to a character heuristic
+    tiktoken = None
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Context window and maximum completion size of a model"""
+
+    context_window: int
+    max_output: int
+
+
+# Context registry for the models this service routes to, including every
+# model the chat UI offers (fnx-next-24/app/ava/config/models.ts)
+MODEL_LIMITS: Dict[str, ModelLimits] = {
+    "openai/gpt-4o-mini": ModelLimits(128000, 16384),
+    "openai/gpt-4o": ModelLimits(128000, 16384),
+    "openai/gpt-3.5-turbo": ModelLimits(16385, 4096),
+    "anthropic/claude-sonnet-4": ModelLimits(200000, 64000),
+    "anthropic/claude-3.5-sonnet": ModelLimits(200000, 8192),
+    "anthropic/claude-3-haiku": ModelLimits(200000, 4096),
+    "qwen/qwen3-235b-a22b": ModelLimits(40960, 8192),
+    "mistralai/mistral-small-3.2-24b-instruct": ModelLimits(128000, 8192),
+    "mistralai/mistral-7b-instruct": ModelLimits(32768, 4096),
+    "cohere/command-r-08-2024": ModelLimits(128000, 4000),
+    "google/gemini-flash-1.5": ModelLimits(1000000, 8192),
+}
+
+
+class ContextBudgetError(ValueError):
+    """Raised when a prompt cannot fit the model's context window"""
+
+    def __init__(self, model: str, prompt_tokens: int, context_window: int):
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.context_window = context_window
+        super().__init__(
+            f"Prompt of ~{prompt_tokens} tokens does not fit {model} "
+            f"({context_window} token context)"
+        )
+
+
+@dataclass
+class TokenPlan:
+    """Outcome of a pre-flight budget check"""
+
+    prompt_tokens: int
+    max_tokens: Optional[int]
+    available_tokens: Optional[int]  # None when the model's limits are unknown
+    fits: bool
+
+
+class TokenBudgeter:
+    """
+    Counts prompt tokens locally before a request is sent, sizes
+    `max_tokens` to what is left of the model's context window, and tracks
+    how close the local count is to the usage the provider reports.
+    """
+
+    # Per-message framing tokens added by chat templates
+    MESSAGE_OVERHEAD = 4
+    REPLY_PRIMING = 3
+
+    def __init__(
+        self,
+        model_limits: Optional[Dict[str, ModelLimits]] = None,
+        safety_margin: float = 0.05,
+        min_completion_tokens: int = 256,
+    ):
+        """
+        Args:
+            model_limits: Overrides/additions to the built-in model registry
+            safety_margin: Fraction of the context kept free to absorb
+                tokenizer differences between providers
+            min_completion_tokens: Smallest completion worth sending a
+                request for
+        """
+        self.model_limits = {**MODEL_LIMITS, **(model_limits or {})}
+        self.safety_margin = safety_margin
+        self.min_completion_tokens = min_completion_tokens
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                print(f"⚠️ tiktoken encoding unavailable, estimating tokens: {e}")
+        self._count_cache: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._usage: Dict[tuple, Dict[str, float]] = {}
+        self._unknown_models: set = set()
+
+    def limits_for(self, model: str) -> Optional[ModelLimits]:
+        """Limits of a registered model, None (logged once) for unknown ones"""
+        limits = self.model_limits.get(model)
+        if limits is None and model not in self._unknown_models:
+            self._unknown_models.add(model)
+            print(f"⚠️ No context limits registered for {model}, skipping token budgeting")
+        return limits
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        # Long strings (system prompt, tool schemas) repeat on every call
+        cacheable = len(text) > 2000
+        if cacheable:
+            cached = self._count_cache.get(text)
+            if cached is not None:
+                return cached
+        if self._encoding is not None:
+            count = len(self._encoding.encode(text, disallowed_special=()))
+        else:
+            count = len(text) // 4 + 1
+        if cacheable:
+            if len(self._count_cache) >= 256:
+                self._count_cache.clear()
+            self._count_cache[text] = count
+        return count
+
+    def count_messages(
+        self, messages: List[Dict[str, Any]], tools: Optional[List[Dict]] = None
+    ) -> int:
+        """Estimates the prompt tokens of a chat request"""
+        total = self.REPLY_PRIMING
+        for message in messages:
+            total += self.MESSAGE_OVERHEAD
+            content = message.get("content")
+            if isinstance(content, str):
+                total += self.count_text(content)
+            elif content is not None:
+                total += self.count_text(json.dumps(content, default=str))
+            if message.get("tool_calls"):
+                total += self.count_text(json.dumps(message["tool_calls"], default=str))
+        if tools:
+            total += self.count_text(json.dumps(tools, default=str))
+        return total
+
+    def plan(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict]] = None,
+        max_tokens: Optional[int] = None,
+    ) -> TokenPlan:
+        """
+        Counts the prompt and sizes the completion budget.
+
+        A requested `max_tokens` is clamped to what is left of the context.
+        Without one, `max_tokens` is only set when the remaining context is
+        smaller than the model's output limit, so the provider never rejects
+        the request for overflowing. Models without registered limits are
+        not budgeted: the request goes out as asked.
+        """
+        limits = self.limits_for(model)
+        prompt_tokens = self.count_messages(messages, tools)
+        if limits is None:
+            return TokenPlan(prompt_tokens, max_tokens, None, True)
+        usable = int(limits.context_window * (1 - self.safety_margin))
+        available = max(usable - prompt_tokens, 0)
+
+        if max_tokens is not None:
+            planned = min(max_tokens, available, limits.max_output)
+        elif available < limits.max_output:
+            planned = available
+        else:
+            planned = None
+
+        needed = self.min_completion_tokens
+        if max_tokens is not None:
+            needed = min(needed, max_tokens)
+        fits = available >= max(needed, 1)
+        return TokenPlan(prompt_tokens, planned, available, fits)
+
+    def record_usage(
+        self, purpose: str, model: str, predicted: int, actual: Optional[int]
+    ):
+        """Compares the local prompt estimate with the provider's count"""
+        if not actual:
+            return
+        with self._lock:
+            usage = self._usage.setdefault(
+                (purpose, model),
+                {"requests": 0, "predicted": 0, "actual": 0, "abs_error": 0},
+            )
+            usage["requests"] += 1
+            usage["predicted"] += predicted
+            usage["actual"] += actual
+            usage["abs_error"] += abs(actual - predicted)
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict]]:
+        """Predicted vs actual prompt tokens per purpose and model"""
+        with self._lock:
+            stats: Dict[str, Dict[str, Dict]] = {}
+            for (purpose, model), usage in self._usage.items():
+                stats.setdefault(purpose, {})[model] = {
+                    "requests": usage["requests"],
+                    "predicted_prompt_tokens": usage["predicted"],
+                    "actual_prompt_tokens": usage["actual"],
+                    "mean_abs_error_pct": (
+                        usage["abs_error"] / usage["actual"] * 100
+                        if usage["actual"]
+                        else 0.0
+                    ),
+                }
+            return stats
@@ -4,11 +4,16 @@ import json
 import os
 import asyncio
 import inspect
-from typing import List, Dict, TypedDict, Annotated
-from LLM.system_prompt import get_model_specific_prompt
+from typing import List, Dict, Optional, TypedDict, Annotated
+from LLM.system_prompt import (
+    get_model_specific_prompt,
+    get_session_context_message,
+    strip_session_context,
+)
 from LLM.tool_definition import tool_definition
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import StreamWriter
 from mongo_client import MongoClient
 from title_generator import TitleGenerator
 from tools.search_tool import ContactsSearchTool
@@ -17,12 +22,27 @@ from tools.generate_email_tool import EmailGeneratorTool
 from tools.create_cadence_step_tool import CadenceStepTool
 from tools.create_cadence_tool import CadenceTool
 from tools.add_contacts_to_cadence_tool import AddContactsToCadenceTool
-from enum_matcher import enum_data_loader
-from execution_type_analyser import ExecutionPlan, ExecutionTypeAnalyzer, ExecutionStep
+from enum_matcher import EnumResolver, enum_data_loader
+from execution_type_analyser import (
+    DagScheduler,
+    ExecutionPlan,
+    ExecutionStep,
+    ExecutionTypeAnalyzer,
+)
 import operator
 from clodura_client import CloduraClient
 from LLM.open_router_client import OpenRouterClient, ResponseFormat
-from conversation_compressor import compress_conversation_if_needed
+from LLM.llm_scheduler import LLMScheduler
+from LLM.model_health import ModelHealthRegistry
+from LLM.response_cache import ResponseCache
+from semantic_cache import SemanticCache
+from http_recording import transport_factory_from_env
+from plan_speculation import PlanSpeculator
+from tool_contracts import READ_ONLY_TOOLS
+from conversation_compressor import (
+    MistralCompressionConfig,
+    compress_conversation_if_needed,
+)
 
 
 def dedupe_messages_reducer(existing: List[Dict], new: List[Dict]) -> List[Dict]:
@@ -101,9 +121,21 @@ class LangGraphSalesAgent:
             db_name="ai-sdr",
             open_router_logs_collection="llm_requests",
             conversations_collection="conversations",
+            prompt_blob_min_bytes=int(os.getenv("PROMPT_BLOB_MIN_BYTES", "1024")),
+            log_batch_size=int(os.getenv("MONGO_LOG_BATCH_SIZE", "100")),
+            log_flush_interval=float(os.getenv("MONGO_LOG_FLUSH_INTERVAL", "1.0")),
+            log_queue_size=int(os.getenv("MONGO_LOG_QUEUE_SIZE", "10000")),
+            log_drop_policy=os.getenv("MONGO_LOG_DROP_POLICY", "drop_oldest"),
         )
+        # CLODURA_TRANSPORT_MODE / LLM_TRANSPORT_MODE=record|replay run the
+        # agent against recorded API traffic (see http_recording.py)
+        clodura_transport = transport_factory_from_env("CLODURA")
         self.clodura_client = CloduraClient(
-            clodura_base_url, clodura_token, self.user_id, self.mongo_client
+            clodura_base_url,
+            self.clodura_token,
+            self.user_id,
+            self.mongo_client,
+            transport_factory=clodura_transport,
         )
 
         self.search_client = CloduraClient(
@@ -111,6 +143,7 @@ class LangGraphSalesAgent:
             "wl1df8mLii6nMjc9LlzSSTxpJkUPP9OM",
             self.user_id,
             self.mongo_client,
+            transport_factory=clodura_transport,
         )
 
         # Get log level from environment, default to INFO
@@ -121,6 +154,31 @@ class LangGraphSalesAgent:
             enable_logging=True,
             log_level=log_level,
             mongo_logger=self.mongo_client,
+            max_connections=int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(
+                os.getenv("OPENROUTER_MAX_KEEPALIVE_CONNECTIONS", "10")
+            ),
+            default_timeout=float(os.getenv("OPENROUTER_TIMEOUT", "30")),
+            http2=os.getenv("OPENROUTER_HTTP2", "false").lower() == "true",
+            response_cache=ResponseCache(
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+                disk_path=os.getenv("LLM_CACHE_DIR"),
+            ),
+            model_health=ModelHealthRegistry(
+                failure_threshold=int(os.getenv("MODEL_CIRCUIT_FAILURES", "5")),
+                cooldown_seconds=float(
+                    os.getenv("MODEL_CIRCUIT_COOLDOWN_SECONDS", "30")
+                ),
+            ),
+            scheduler=LLMScheduler(
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                interactive_reserve=int(os.getenv("LLM_INTERACTIVE_RESERVE", "2")),
+                model_budgets=json.loads(os.getenv("LLM_MODEL_BUDGETS", "{}")),
+            ),
+            transport_factory=transport_factory_from_env(
+                "LLM", normalize=strip_session_context
+            ),
         )
         self.title_generator = TitleGenerator(llm_client=self.openrouter_client)
 
@@ -146,6 +204,9 @@ class LangGraphSalesAgent:
             self.user_id, clodura_client=self.clodura_client
         )
         self.enum_data = enum_data_loader()
+        self.enum_resolver = EnumResolver(self.enum_data)
+        # Candidate values shown per unresolved term in the mapping prompt
+        self.mapping_candidates = int(os.getenv("MAPPING_CANDIDATES_PER_TERM", "12"))
 
         self.tool_registry = {
             "search_leads": self.search_tool.search_leads,
@@ -156,7 +217,37 @@ class LangGraphSalesAgent:
         }
 
         # Initialize execution type analyzer
-        self.execution_analyzer = ExecutionTypeAnalyzer(self.openrouter_client)
+        self.execution_analyzer = ExecutionTypeAnalyzer(
+            self.openrouter_client,
+            semantic_cache=SemanticCache(
+                similarity_threshold=float(
+                    os.getenv("PLANNER_CACHE_SIMILARITY", "0.92")
+                )
+            ),
+        )
+        # Ready plan steps run concurrently, bounded and individually timed out
+        self.max_parallel_steps = int(os.getenv("MAX_PARALLEL_STEPS", "4"))
+        self.step_timeout = float(os.getenv("STEP_TIMEOUT_SECONDS", "120"))
+        # Plans made only of these side-effect free tools run without review
+        requested_tools = {
+            tool.strip()
+            for tool in os.getenv(
+                "AUTO_APPROVE_TOOLS", ",".join(sorted(READ_ONLY_TOOLS))
+            ).split(",")
+            if tool.strip()
+        }
+        if requested_tools - READ_ONLY_TOOLS:
+            print(
+                f"⚠️ Ignoring AUTO_APPROVE_TOOLS with side effects: {sorted(requested_tools - READ_ONLY_TOOLS)}"
+            )
+        self.auto_approve_tools = frozenset(requested_tools & READ_ONLY_TOOLS)
+        # Read-only steps start while the plan waits for approval
+        self.plan_speculator = None
+        if os.getenv("SPECULATIVE_EXECUTION", "true").lower() == "true":
+            self.plan_speculator = PlanSpeculator(
+                self._run_plan_step,
+                ttl=float(os.getenv("SPECULATION_TTL_SECONDS", "600")),
+            )
         # Memory management: session_id -> conversation data
         self.memory = {}
         self.max_conversation_length = 100
@@ -185,8 +276,13 @@ class LangGraphSalesAgent:
             self._should_create_plan,
             {"plan": "plan_execution", "respond": "respond"},
         )
-        # Direct flow from plan_execution to review_plan (interrupt-based)
-        workflow.add_edge("plan_execution", "review_plan")
+        # Plans with side effects go to review_plan (interrupt-based);
+        # read-only plans are executed straight away
+        workflow.add_conditional_edges(
+            "plan_execution",
+            self._route_plan_approval,
+            {"review": "review_plan", "execute": "execute_step"},
+        )
 
         # With interrupts, review_plan always flows to execute_step
         workflow.add_edge("review_plan", "execute_step")
@@ -212,10 +308,14 @@ class LangGraphSalesAgent:
             ],  # Static interrupt before review_plan node
         )
 
-    async def _agent_node(self, state: AgentState) -> AgentState:
+    async def _agent_node(self, state: AgentState, writer: StreamWriter) -> AgentState:
         """
         Refactored agent node focusing on its core responsibility:
         deciding the next action based on the current conversation state.
+
+        The completion is streamed; content deltas are pushed to the graph's
+        custom stream as `token` events so text answers reach the client
+        before the model finishes.
         """
         session_id = state["session_id"]
         print(f"state--->{state}")
@@ -225,6 +325,20 @@ class LangGraphSalesAgent:
         api_messages, _ = await compress_conversation_if_needed(
             api_messages, session_id, self.openrouter_client
         )
+        # Compress harder if the prompt still cannot fit the model's context
+        budgeter = self.openrouter_client.token_budgeter
+        if not budgeter.plan(model, api_messages, self.tools).fits:
+            context_window = budgeter.limits_for(model).context_window
+            print(f"📏 Prompt exceeds {model} context, compressing to fit")
+            api_messages, _ = await compress_conversation_if_needed(
+                api_messages,
+                session_id,
+                self.openrouter_client,
+                MistralCompressionConfig(
+                    max_total_tokens=context_window // 2,
+                    target_compressed_tokens=context_window // 4,
+                ),
+            )
         # Enhanced LLM input logging
         try:
             # 4. Use a deterministic temperature for reliable tool calling.
@@ -235,6 +349,10 @@ class LangGraphSalesAgent:
                 model=model,
                 tools=self.tools,
                 temperature=0.1,  # Use a low temperature for predictable planning
+                stream=True,
+                on_token=lambda token: writer(
+                    {"type": "token", "node": "agent", "content": token}
+                ),
             )
 
             assistant_message = response["choices"][0]["message"]
@@ -285,6 +403,8 @@ class LangGraphSalesAgent:
         4.  Injecting tool results from the DB after the corresponding 'assistant' message.
         5.  **Critically, inserting a "bridging" assistant message if a 'user' message
             would otherwise follow a 'tool' message.**
+        6.  Keeping the system prompt + history a stable, cacheable prefix: the
+            current date/time goes in a session context message at the end.
         """
         session_id = state["session_id"]
         messages_in_state = state["messages"]
@@ -373,6 +493,22 @@ class LangGraphSalesAgent:
 
                         api_messages.append(error_tool_message)
 
+        # Volatile data goes just before the latest user turn: everything
+        # before it is a reusable prefix, and the request still ends on a
+        # user or tool message (Mistral rejects a trailing system message)
+        last_user = next(
+            (
+                i
+                for i in range(len(api_messages) - 1, -1, -1)
+                if api_messages[i].get("role") == "user"
+            ),
+            None,
+        )
+        api_messages.insert(
+            last_user if last_user is not None else min(1, len(api_messages)),
+            get_session_context_message(),
+        )
+
         return api_messages
 
     def _normalize_assistant_message(self, assistant_message: Dict) -> Dict:
@@ -396,19 +532,27 @@ class LangGraphSalesAgent:
         Creates an execution plan based on tool calls from the LLM.
         This node now includes a crucial preprocessing step to validate and
         map tool arguments before creating the final plan.
+
+        Independent planning work overlaps: argument mapping for every tool
+        call runs concurrently, alongside missing-tools detection and then
+        dependency analysis, all sharing one context snapshot. The two
+        analyses get snapshots of the calls (see `_tool_call_outline`), so
+        mapping never rewrites what they are looking at; dependency analysis
+        also sees the arguments the model wrote, which decide whether a
+        search is scoped to an earlier step's results.
         """
         # Creating execution plan
         assistant_message = state["messages"][-1]
         session_id = state["session_id"]
         raw_tool_calls = assistant_message.get("tool_calls", [])
 
-        # Get context from previous tool outputs for missing tools analysis
-        context_info = self._build_context_from_history(session_id)
-
         if not raw_tool_calls:
             # No tool calls to process
             return {"execution_plan": None}
 
+        # Built once and shared by missing-tools, mapping and dependency analysis
+        context_info = self._build_context_from_history(session_id)
+
         user_message = next(
             (m["content"] for m in reversed(state["messages"]) if m["role"] == "user"),
             "",
@@ -418,11 +562,30 @@ class LangGraphSalesAgent:
             tool_name = call.get("function", {}).get("name", "unknown")
             print(f"🟡   {i+1}. {tool_name}")
 
-        # # Should we add missing tools args too here?
-        missing_analysis = await self.execution_analyzer._check_missing_tools(
-            session_id, user_message, raw_tool_calls, context_info
+        # Enum terms resolve locally; whatever is left goes to a single mapping
+        # LLM call that overlaps with the missing-tools check
+        original_tool_calls = list(raw_tool_calls)
+        preprocessed_tools = [
+            self._preprocess_tool_call(tool_call) for tool_call in original_tool_calls
+        ]
+        mapping_task = asyncio.ensure_future(
+            self._map_unresolved_enum_terms(
+                session_id, [tool for tool in preprocessed_tools if tool is not None]
+            )
         )
 
+        # # Should we add missing tools args too here?
+        try:
+            missing_analysis = await self.execution_analyzer._check_missing_tools(
+                session_id,
+                user_message,
+                self._tool_call_outline(raw_tool_calls),
+                context_info,
+            )
+        except BaseException:
+            mapping_task.cancel()
+            raise
+
         if missing_analysis.get("has_missing_tools", False):
             missing_tools = missing_analysis.get("missing_tools", [])
             print(f"🟡 Missing tools to add: {missing_tools}")
@@ -476,41 +639,45 @@ class LangGraphSalesAgent:
             print(f"🟡 ✅ No missing tools - proceeding with execution plan")
             updated_messages = state["messages"]  # No changes needed
 
-        preprocessed_tools = []
-        for i, tool_call in enumerate(raw_tool_calls):
+        # The tool list is final now: dependency analysis can overlap with
+        # the rest of the mapping since it works on a snapshot of the calls
+        def has_json_arguments(tool_call: Dict) -> bool:
             try:
-                tool_name = tool_call["function"]["name"]
-                original_args = json.loads(tool_call["function"]["arguments"])
-                preprocessed_args = await self._preprocess_tool_args(
-                    session_id, tool_name, original_args
-                )
-                # print(f"🔧   After preprocessing: {preprocessed_args}")
-
-                preprocessed_tools.append(
-                    {
-                        "tool_call": tool_call,
-                        "tool_name": tool_name,
-                        "preprocessed_args": preprocessed_args,
-                    }
-                )
-
-            except json.JSONDecodeError as e:
-                print(
-                    f"🔧   ❌ JSON Error processing tool call arguments: {e}. Skipping call."
-                )
-                continue  # Skip this broken tool call
-            except Exception as e:
-                print(f"🔧   ❌ Error preprocessing {tool_call}: {e}")
-                # Keep original for batch validation
-                preprocessed_tools.append(
-                    {
-                        "tool_call": tool_call,
-                        "tool_name": tool_call["function"]["name"],
-                        "preprocessed_args": json.loads(
-                            tool_call["function"]["arguments"]
-                        ),
-                    }
-                )
+                json.loads(tool_call["function"]["arguments"])
+                return True
+            except json.JSONDecodeError:
+                return False
+
+        # Broken calls are dropped by preprocessing; keep step indices aligned
+        analysis_task = asyncio.ensure_future(
+            self._analyze_plan_dependencies(
+                session_id,
+                self._tool_call_outline(
+                    [call for call in raw_tool_calls if has_json_arguments(call)],
+                    with_arguments=True,
+                ),
+                state["messages"],
+                context_info,
+            )
+        )
+        added_tools = [
+            self._preprocess_tool_call(tool_call)
+            for tool_call in raw_tool_calls[len(original_tool_calls) :]
+        ]
+        try:
+            await mapping_task
+            # System-generated calls are built from context and rarely need
+            # mapping; no LLM call is made when everything resolved locally
+            await self._map_unresolved_enum_terms(
+                session_id, [tool for tool in added_tools if tool is not None]
+            )
+        except BaseException:
+            analysis_task.cancel()
+            raise
+        # Skip broken tool calls
+        preprocessed_tools = [
+            tool for tool in preprocessed_tools + added_tools if tool is not None
+        ]
 
         # Step 2: Batch LLM validation (single LLM call for all tools)
         # COMMENTED OUT: Batch validation step to reduce latency
@@ -549,7 +716,11 @@ class LangGraphSalesAgent:
 
         # Pass the cleaned and validated tool calls to the plan creation logic
         execution_plan = await self._create_execution_plan(
-            session_id, processed_tool_calls, state["messages"]
+            session_id,
+            processed_tool_calls,
+            state["messages"],
+            context_info=context_info,
+            analysis=await analysis_task,
         )
 
         print(f"\n📋 Execution Plan Summary")
@@ -583,6 +754,12 @@ class LangGraphSalesAgent:
         execution_plan_dict = execution_plan.to_serializable()
         execution_plan_dict["plan_id"] = plan_id
 
+        auto_approved = bool(execution_plan.steps) and all(
+            step.tool_name in self.auto_approve_tools for step in execution_plan.steps
+        )
+        if auto_approved:
+            print(f"✅ Plan {plan_id} is read-only, executing without review")
+
         return {
             "execution_plan": execution_plan_dict,  # Serialize for LangGraph state
             "plan_id": plan_id,  # Track current plan
@@ -593,6 +770,7 @@ class LangGraphSalesAgent:
                 "status": "planned",
                 "message": f"Created execution plan with {len(execution_plan.steps)} steps",
                 "plan_id": plan_id,
+                "auto_approved": auto_approved,
             },
         }
 
@@ -726,31 +904,64 @@ class LangGraphSalesAgent:
 
         return filtered_args
 
-    async def _preprocess_tool_args(
-        self, session_id: str, tool_name: str, original_args: Dict
-    ) -> Dict:
+    def _preprocess_tool_call(self, tool_call: Dict) -> Optional[Dict]:
+        """
+        Validates one tool call's arguments and resolves its enum terms
+        locally. Returns None for calls whose arguments are not valid JSON.
+        """
+        try:
+            tool_name = tool_call["function"]["name"]
+            original_args = json.loads(tool_call["function"]["arguments"])
+            preprocessed_args, unresolved = self._preprocess_tool_args(
+                tool_name, original_args
+            )
+            # print(f"🔧   After preprocessing: {preprocessed_args}")
+
+            return {
+                "tool_call": tool_call,
+                "tool_name": tool_name,
+                "preprocessed_args": preprocessed_args,
+                "unresolved": unresolved,
+            }
+
+        except json.JSONDecodeError as e:
+            print(
+                f"🔧   ❌ JSON Error processing tool call arguments: {e}. Skipping call."
+            )
+            return None  # Skip this broken tool call
+        except Exception as e:
+            print(f"🔧   ❌ Error preprocessing {tool_call}: {e}")
+            # Keep original for batch validation
+            return {
+                "tool_call": tool_call,
+                "tool_name": tool_call["function"]["name"],
+                "preprocessed_args": json.loads(tool_call["function"]["arguments"]),
+                "unresolved": {},
+            }
+
+    def _preprocess_tool_args(self, tool_name: str, original_args: Dict) -> tuple:
         """
         Helper function that preprocesses arguments for search tools by mapping
-        user-friendly terms to valid API enum values.
+        user-friendly terms to valid API enum values, as far as that can be
+        done locally (exact, alias and fuzzy matches).
+
+        Returns:
+            (args, unresolved): the arguments with resolved enum values, and
+            the terms per field that still need LLM mapping (left out of
+            `args` until `_map_unresolved_enum_terms` merges them back)
         """
         # First, validate and filter arguments
         validated_args = self._validate_and_filter_tool_args(tool_name, original_args)
 
         # This function only applies to search_leads and search_companies
         if tool_name not in ["search_leads", "search_companies"]:
-            return validated_args
-
-        # Preprocessing arguments
-        # Original arguments processed
+            return validated_args, {}
 
         try:
             valid_enums = self.enum_data
             # Identify which fields in the current tool call need enum mapping
             fields_to_map = {
-                field: {
-                    "user_values": values,
-                    "valid_values": valid_enums.get(field, []),
-                }
+                field: values
                 for field, values in validated_args.items()
                 # Ensure the field is mappable and the user provided values
                 if field in valid_enums and isinstance(values, list) and values
@@ -758,116 +969,118 @@ class LangGraphSalesAgent:
 
             if not fields_to_map:
                 # No enum mapping required
-                return validated_args
+                return validated_args, {}
 
-            # Call your enhanced mapping function
-            mapped_args = await self._enhanced_parameter_mapping(
-                session_id, fields_to_map
-            )
-
-            if mapped_args is None:
-                # Mapping failed - using validated arguments
-                return validated_args
-
-            # Merge mapped results with validated args that were not processed
+            resolved, unresolved = self.enum_resolver.resolve_fields(fields_to_map)
             final_args = validated_args.copy()
-            final_args.update(mapped_args)
-            # Arguments processed successfully
-            return final_args
+            for field in fields_to_map:
+                final_args[field] = resolved.get(field, [])
+            if unresolved:
+                print(f"🔧 Enum terms left for LLM mapping: {unresolved}")
+            else:
+                print(f"🔧 Enum values resolved locally: {resolved}")
+            return final_args, unresolved
 
         except Exception as e:
             # Error during preprocessing
             # In case of a critical error, return the validated arguments
-            return validated_args
+            return validated_args, {}
 
-    async def _enhanced_parameter_mapping(
-        self, session_id: str, fields_to_map: dict
-    ) -> dict:
-        """Unified parameter mapping with Mistral primary, Claude fallback"""
+    async def _map_unresolved_enum_terms(
+        self, session_id: str, preprocessed_tools: List[Dict]
+    ):
+        """
+        Maps every enum term that local resolution left over, across all the
+        plan's tool calls, in a single LLM call. Each term only comes with its
+        closest candidate values, and the answer is checked against those
+        candidates. Terms that cannot be mapped are dropped, so invalid enum
+        values never reach the search API.
+        """
+        items = []
+        for tool in preprocessed_tools:
+            for field, terms in tool.get("unresolved", {}).items():
+                for term in terms:
+                    candidates = self.enum_resolver.candidates(
+                        field, str(term), self.mapping_candidates
+                    )
+                    items.append((tool, field, term, candidates))
+        if not items:
+            return
 
         prompt_parts = [
-            "You are a precise parameter mapping expert for a professional contact and company search system.",
-            "Map user-provided search terms to valid enum values from our database.",
+            "Map each user search term to the valid options listed for it.",
             "",
-            "CRITICAL RULES:",
-            "1. ONLY return values that exist in the provided valid_values lists",
-            "2. If no valid mapping exists for a field, omit that field entirely",
-            "3. Be conservative - better to omit than to guess incorrectly",
-            "4. Return empty array [] if no valid matches found for a field",
+            "RULES:",
+            "1. ONLY return options from that term's list, spelled exactly",
+            "2. Return [] for a term when no option fits - better to omit than to guess",
+            "3. If multiple options fit, return all of them",
+            "4. Expand abbreviations (e.g. BFSI, F&B) to their full forms first",
             "5. Treat Bangalore and Bengaluru as the same",
             '6. For "decision makers", map to seniority: ["CEO", "CTO", "CFO", "CMO", "COO", "CXO", "President", "Founder", "Vice President", "Director"]',
             "7. For 'procurement', map to functionalLevel: ['Purchase']",
-            "8. For company searches: use hqCity, hqState, hqCountry",
-            "9. For contact searches: use city, state, country",
-            "10. If multiple relevant values exist, return all of them",
-            "11. If you find abbreviations like BFSI, F&B in industry term, you must map them against their full forms"
             "",
-            "FIELD MAPPING TASKS:",
         ]
-
-        # Add field-specific mapping instructions
-        for field, mapping_info in fields_to_map.items():
-            user_values = mapping_info["user_values"]
-            valid_values = mapping_info["valid_values"]
-
-            prompt_parts.extend(
-                [
-                    f"\n--- {field.upper()} MAPPING ---",
-                    f"User Input: {user_values}",
-                    f"Valid Options: {valid_values}",
-                    f"Task: Map user terms to valid {field} options",
-                ]
+        fields = list(dict.fromkeys(field for _, field, _, _ in items))
+        field_examples = [
+            f"{field}: {self._generate_field_examples(field)}"
+            for field in fields
+            if self._generate_field_examples(field)
+        ]
+        if field_examples:
+            prompt_parts.extend(["EXAMPLES:", *field_examples, ""])
+        prompt_parts.append("TERMS (id | field | term | options):")
+        for i, (_, field, term, candidates) in enumerate(items):
+            prompt_parts.append(
+                f"t{i} | {field} | {json.dumps(term)} | {json.dumps(candidates)}"
             )
-
-            field_examples = self._generate_field_examples(field)
-            if field_examples:
-                prompt_parts.append(f"Examples: {field_examples}")
-
         prompt_parts.extend(
             [
                 "",
                 "OUTPUT FORMAT:",
-                "Return ONLY valid JSON. No markdown, no explanatory text.",
-                'Example: {"seniority": ["CEO", "CTO"], "industry": ["Technology"]}',
-                "",
-                "Remember: Only include fields where you found valid matches",
+                "Return ONLY valid JSON mapping every id to a list of options.",
+                'Example: {"t0": ["Banking", "Insurance"], "t1": []}',
             ]
         )
 
-        unified_prompt = "\n".join(prompt_parts)
-
-        # Try with Mistral first (faster), then Claude fallback (reliable)
-        response = await self.openrouter_client.chat_completion_with_retries(
-            session_id=session_id,
-            purpose="parameter_mapping",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a precise parameter mapping expert. Follow instructions exactly and return only valid JSON.",
-                },
-                {"role": "user", "content": unified_prompt},
-            ],
-            model_preference_list=[
-                "openai/gpt-4o-mini",  # Additional fall
-                "anthropic/claude-3.5-sonnet",  # Claude (reliable fallback)
-            ],
-            response_format=ResponseFormat.JSON,
-            temperature=0.0,
-            max_tokens=1000,
-            max_retries_per_model=1,
-        )
-
-        if response:
-            try:
+        mapped = {}
+        try:
+            response = await self.openrouter_client.chat_completion_with_retries(
+                session_id=session_id,
+                purpose="parameter_mapping",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a precise parameter mapping expert. Follow instructions exactly and return only valid JSON.",
+                    },
+                    {"role": "user", "content": "\n".join(prompt_parts)},
+                ],
+                response_format=ResponseFormat.JSON,
+                temperature=0.0,
+                max_tokens=1000,
+            )
+            if response:
                 content = self.openrouter_client.extract_content(response)
                 if content and content.strip():
-                    mapped = self._normalize_keys_and_values(json.loads(content))
-                    return mapped
-            except Exception as e:
-                pass
-
-        # All models failed for parameter mapping
-        return None
+                    mapped = json.loads(content)
+        except Exception as e:
+            print(f"🔧 ❌ Enum mapping failed, dropping unmapped terms: {e}")
+        if not isinstance(mapped, dict):
+            mapped = {}
+
+        for i, (tool, field, term, candidates) in enumerate(items):
+            values = [
+                value
+                for value in self.enum_resolver.validate(field, mapped.get(f"t{i}", []))
+                if value in candidates
+            ]
+            if not values:
+                print(f"🔧 Dropping unmapped {field} term: {term!r}")
+            field_values = tool["preprocessed_args"].setdefault(field, [])
+            for value in values:
+                if value not in field_values:
+                    field_values.append(value)
+            tool["unresolved"] = {}
+        print(f"🔧 Mapped {len(items)} enum term(s) in one call: {mapped}")
 
     # Helper method to generate examples for the mapping prompt
     def _generate_field_examples(self, field_key: str) -> str:
@@ -884,100 +1097,6 @@ class LangGraphSalesAgent:
         }
         return examples.get(field_key, "")
 
-    def _normalize_keys_and_values(self, mapped: dict) -> dict:
-        """Normalize keys and expand values with synonyms"""
-        # Data processed before normalization
-        expected_keys = {
-            "size": "size",
-            "seniority": "seniority",
-            "functionallevel": "functionalLevel",
-            "functionalLevel": "functionalLevel",
-            "revenue": "revenue",
-            "fundingtype": "fundingType",
-            "fundingType": "fundingType",
-            "hiringareas": "hiringAreas",
-            "hiringAreas": "hiringAreas",
-            "company_types": "company_types",
-            "companytypes": "company_types",
-            "companyTypes": "company_types",
-        }
-
-        # Value synonyms - bidirectional mapping
-        synonyms = {
-            "bangalore": "bengaluru",
-            "bengaluru": "bangalore",
-            "bombay": "mumbai",
-            "mumbai": "bombay",
-            "calcutta": "kolkata",
-            "kolkata": "calcutta",
-            "madras": "chennai",
-            "chennai": "madras",
-        }
-
-        normalized = {}
-
-        for k, v in mapped.items():
-            # Normalize key
-            key_norm = expected_keys.get(k.lower()) or expected_keys.get(k)
-            if not key_norm:
-                continue
-
-            # Ensure value is list
-            values = v if isinstance(v, list) else [v]
-
-            # Expand values with synonyms
-            expanded = set(values)
-            for val in values:
-                if isinstance(val, str) and val.lower() in synonyms:
-                    expanded.add(synonyms[val.lower()])
-
-            # Merge with existing or set new
-            if key_norm in normalized:
-                normalized[key_norm].update(expanded)
-            else:
-                normalized[key_norm] = expanded
-
-        # Convert sets back to lists
-        return {k: list(v) for k, v in normalized.items()}
-
-    def _normalize_keys_and_values(self, mapped: dict) -> dict:
-        """Ensure mapped keys follow expected schema casing and remove invalid keys"""
-        expected_keys = {
-            "industry": "industry",
-            "city": "city",
-            "hqcity": "hqCity",
-            "hqstate": "hqState",
-            "hqcountry": "hqCountry",
-            "size": "size",
-            "seniority": "seniority",
-            "designation": "designation",
-            "functionallevel": "functionalLevel",
-            "functionalLevel": "functionalLevel",
-            "location": "location",
-            "company_type": "company_type",
-            "companytype": "company_type",
-            "speciality": "speciality",
-            "revenue": "revenue",
-            "fundingtype": "fundingType",
-            "fundingType": "fundingType",
-        }
-
-        normalized = {}
-        for k, v in mapped.items():
-            key_norm = expected_keys.get(k)
-            if key_norm:
-                # Merge values if already exists
-                if key_norm in normalized:
-                    normalized[key_norm].extend(v)
-                else:
-                    normalized[key_norm] = v
-
-        # Deduplicate list values
-        for k in normalized:
-            normalized[k] = list(set(normalized[k]))
-
-        return normalized
-
     # Whats the use case of this return statement?
     async def _review_plan_node(self, state: AgentState) -> AgentState:
         """Review node that uses LangGraph interrupt for clean human-in-the-loop approval."""
@@ -1006,142 +1125,171 @@ class LangGraphSalesAgent:
             "plan_review_event": plan_review_event,
         }
 
-    async def _execute_step_node(self, state: AgentState) -> AgentState:
-        """Executes all ready steps in a batch, enabling parallel execution."""
+    async def _execute_step_node(
+        self, state: AgentState, writer: StreamWriter
+    ) -> AgentState:
+        """
+        Executes the plan as a DAG within a single node invocation.
+
+        A step starts as soon as its last dependency finishes (longest
+        critical path first, up to `max_parallel_steps` at a time), rather
+        than waiting for the whole batch it became ready alongside. A failed
+        step cancels its downstream steps, and an empty search skips the
+        searches that would only have looked for nothing.
+
+        A `progress` event is pushed to the graph's custom stream as each step
+        starts and finishes, so the client sees results before the slowest
+        step is done.
+        """
         print("⚡ Executing step(s)")
         execution_plan_data = state["execution_plan"]
         print(f"{execution_plan_data}")
         completed_steps = state.get("completed_steps", [])
         step_results = state.get("step_results", {})
         session_id = state.get("session_id", "default-session")
+        plan_id = state.get("plan_id", "unknown")
         if not execution_plan_data:
             return state
 
         # Deserialize execution plan from state
         execution_plan = ExecutionPlan.from_serializable(execution_plan_data)
-        ready_steps = execution_plan.get_ready_steps(completed_steps)
-        if not ready_steps:
-            # No ready steps to execute
-            return state
+        scheduler = DagScheduler(execution_plan, completed_steps)
+        fingerprints = PlanSpeculator.fingerprints(execution_plan)
+        already_finished = {
+            step_id for step_id in scheduler.states if scheduler.is_terminal(step_id)
+        }
 
-        print(f"⚡ Found {len(ready_steps)} ready steps to execute in this batch.")
-        tool_outputs_for_this_turn = []
-        newly_completed_steps = []
+        processed_steps = []
+        running: Dict[asyncio.Future, ExecutionStep] = {}
 
-        for current_step in ready_steps:
-            progress = {
-                "status": "executing",
-                "step_id": current_step.step_id,
-                "description": current_step.description,
+        def step_info(step: ExecutionStep) -> dict:
+            return {
+                "step_id": step.step_id,
+                "tool_name": step.tool_name,
+                "description": step.description,
             }
 
-            try:
-                # Prepare args, which might raise an exception if a dependency failed
-                tool_args = self._prepare_tool_args(current_step, step_results)
-                tool_func = self.tool_registry.get(current_step.tool_name)
-                if not tool_func:
-                    raise ValueError(f"Unknown tool: {current_step.tool_name}")
-
-                # Check if the tool function is async
-                if inspect.iscoroutinefunction(tool_func):
-                    # Add session_id for email generation tool
-                    if current_step.tool_name == "generate_email":
-                        tool_args["session_id"] = session_id
-                    # Add recipients for add_contacts_to_cadence if missing
-                    elif (
-                        current_step.tool_name == "add_contacts_to_cadence"
-                        and "recipients_ids" not in tool_args
-                    ):
-                        # Try to get contact IDs from previous search results
-                        for step_id, result in step_results.items():
-                            if isinstance(result, dict) and "contacts" in result:
-                                contact_ids = [
-                                    c.get("id")
-                                    for c in result.get("contacts", [])
-                                    if c.get("id")
-                                ]
-                                if contact_ids:
-                                    tool_args["recipients_ids"] = contact_ids[
-                                        :20
-                                    ]  # Limit to 20 contacts
-                                    break
-
-                    # Filter out invalid parameters using existing validation
-                    tool_args = self._validate_and_filter_tool_args(
-                        current_step.tool_name, tool_args
-                    )
-                    result = await tool_func(**tool_args)
-                else:
-                    # Add session_id for email generation tool
-                    if current_step.tool_name == "generate_email":
-                        tool_args["session_id"] = session_id
-                    # Add recipients for add_contacts_to_cadence if missing
-                    elif (
-                        current_step.tool_name == "add_contacts_to_cadence"
-                        and "recipients_ids" not in tool_args
-                    ):
-                        # Try to get contact IDs from previous search results
-                        for step_id, result in step_results.items():
-                            if isinstance(result, dict) and "contacts" in result:
-                                contact_ids = [
-                                    c.get("id")
-                                    for c in result.get("contacts", [])
-                                    if c.get("id")
-                                ]
-                                if contact_ids:
-                                    tool_args["recipients_ids"] = contact_ids
-                                    break
-
-                    # Filter out invalid parameters using existing validation
-                    tool_args = self._validate_and_filter_tool_args(
-                        current_step.tool_name, tool_args
-                    )
-                    result = tool_func(**tool_args)
-
-                # Store successful result
-                step_results[current_step.step_id] = result
-                progress["status"] = "completed"
-                print(f"✅ Step completed: {current_step.step_id}")
-
-                # Check if this search returned empty results and mark dependent searches for skipping
-                execution_plan_data = state.get("execution_plan")
-                if execution_plan_data:
-                    execution_plan = ExecutionPlan.from_serializable(
-                        execution_plan_data
+        def launch_ready_steps():
+            for step in scheduler.start_ready(self.max_parallel_steps - len(running)):
+                writer(self._stream_progress(step_info(step), status="running"))
+                task = asyncio.ensure_future(
+                    asyncio.wait_for(
+                        self._claim_or_run_plan_step(
+                            step,
+                            step_results,
+                            session_id,
+                            plan_id,
+                            fingerprints[step.step_id],
+                        ),
+                        timeout=self.step_timeout,
                     )
-                    self._check_and_skip_empty_searches(
-                        current_step, result, execution_plan, completed_steps
+                )
+                running[task] = step
+
+        def record_unrun(step_ids: List[str], status: str):
+            for step_id in step_ids:
+                step = execution_plan.step_map[step_id]
+                reason = scheduler.reasons[step_id]
+                print(f"🚫 {status.capitalize()} {step_id}: {reason}")
+                if status == "cancelled":
+                    step_results[step_id] = {
+                        "error": f"Step '{step_id}' cancelled: {reason}",
+                        "status": "cancelled",
+                    }
+                processed_steps.append(step)
+                writer(
+                    self._stream_progress(
+                        {**step_info(step), "reason": reason}, status=status
                     )
+                )
 
-            except Exception as e:
-                error_message = f"Step '{current_step.step_id}' failed: {str(e)}"
-                print(f"❌ {error_message}")
-
-                # Store error result
-                step_results[current_step.step_id] = {
-                    "error": error_message,
-                    "status": "failed",
-                }
-                progress["status"] = "failed"
-                progress["message"] = str(e)
-
-            finally:
-                # CRITICAL: Always mark the step as processed to prevent loops
-                newly_completed_steps.append(current_step.step_id)
-
-                # Get current plan ID
-                plan_id = state.get("plan_id", "unknown")
-
-                tool_outputs_for_this_turn.append(
-                    {
-                        "tool_call_id": current_step.tool_call_id,
-                        "tool_name": current_step.tool_name,
-                        "step_id": current_step.step_id,
-                        "result": step_results[current_step.step_id],
-                        "description": current_step.description,
-                        "plan_id": plan_id,  # Add plan ID for filtering
-                    }
+        try:
+            launch_ready_steps()
+            while running:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
                 )
+                for task in done:
+                    current_step = running.pop(task)
+                    processed_steps.append(current_step)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        reason = (
+                            f"timed out after {self.step_timeout:.0f}s"
+                            if isinstance(e, asyncio.TimeoutError)
+                            else str(e)
+                        )
+                        error_message = f"Step '{current_step.step_id}' failed: {reason}"
+                        print(f"❌ {error_message}")
+                        step_results[current_step.step_id] = {
+                            "error": error_message,
+                            "status": "failed",
+                        }
+                        writer(
+                            self._stream_progress(
+                                {
+                                    **step_info(current_step),
+                                    "result": step_results[current_step.step_id],
+                                },
+                                status="failed",
+                            )
+                        )
+                        record_unrun(
+                            scheduler.fail(current_step.step_id, reason), "cancelled"
+                        )
+                        continue
+
+                    if result is None:
+                        # A tool that returns nothing still completed its step
+                        result = {}
+                    step_results[current_step.step_id] = result
+                    print(f"✅ Step completed: {current_step.step_id}")
+                    writer(
+                        self._stream_progress(
+                            {**step_info(current_step), "result": result}
+                        )
+                    )
+                    scheduler.complete(current_step.step_id)
+                    # Empty searches make independent follow-up searches pointless
+                    record_unrun(
+                        self._check_and_skip_empty_searches(
+                            current_step, result, scheduler
+                        ),
+                        "skipped",
+                    )
+                launch_ready_steps()
+        finally:
+            for task in running:
+                task.cancel()
+            if self.plan_speculator is not None:
+                # Whatever was not claimed (skipped, cancelled) is dropped
+                self.plan_speculator.discard(plan_id)
+
+        record_unrun(scheduler.cancel_unreachable(), "cancelled")
+        scheduler.apply_skips()
+        print(f"⚡ Step states: {scheduler.snapshot()}")
+
+        # Merge in plan order so state is deterministic regardless of timing
+        processed_steps.sort(key=lambda step: execution_plan.steps.index(step))
+        tool_outputs_for_this_turn = [
+            {
+                "tool_call_id": step.tool_call_id,
+                "tool_name": step.tool_name,
+                "step_id": step.step_id,
+                "result": step_results[step.step_id],
+                "description": step.description,
+                "plan_id": plan_id,  # Add plan ID for filtering
+            }
+            for step in processed_steps
+            if step.step_id in step_results
+        ]
+        newly_completed_steps = [
+            step.step_id
+            for step in execution_plan.steps
+            if scheduler.is_terminal(step.step_id)
+            and step.step_id not in already_finished
+        ]
 
         # Create tool result messages for conversation state
         tool_result_messages = []
@@ -1208,6 +1356,7 @@ class LangGraphSalesAgent:
         }
 
         return {
+            "execution_plan": execution_plan.to_serializable(),
             "completed_steps": newly_completed_steps,
             "step_results": step_results,
             "tool_outputs": tool_outputs_for_this_turn,
@@ -1217,6 +1366,101 @@ class LangGraphSalesAgent:
             ],  # Add tool result messages to conversation (only tool messages now)
         }
 
+    async def _claim_or_run_plan_step(
+        self,
+        current_step: ExecutionStep,
+        step_results: Dict[str, Dict],
+        session_id: str,
+        plan_id: str,
+        fingerprint: str,
+    ) -> Dict:
+        """Uses the step's speculative result if it matches, else runs it."""
+        speculated = None
+        if self.plan_speculator is not None:
+            speculated = self.plan_speculator.take(plan_id, current_step, fingerprint)
+        if speculated is not None:
+            try:
+                result = await speculated
+                print(f"🔮 Using speculative result for {current_step.step_id}")
+                return result
+            except Exception as e:
+                print(
+                    f"🔮 Speculative run of {current_step.step_id} failed ({e}), running it again"
+                )
+        return await self._run_plan_step(current_step, step_results, session_id)
+
+    async def _run_plan_step(
+        self,
+        current_step: ExecutionStep,
+        step_results: Dict[str, Dict],
+        session_id: str,
+    ) -> Dict:
+        """Runs a single plan step's tool and returns its raw result."""
+        # Prepare args, which might raise an exception if a dependency failed
+        tool_args = self._prepare_tool_args(current_step, step_results)
+        tool_func = self.tool_registry.get(current_step.tool_name)
+        if not tool_func:
+            raise ValueError(f"Unknown tool: {current_step.tool_name}")
+
+        # Check if the tool function is async
+        if inspect.iscoroutinefunction(tool_func):
+            # Add session_id for email generation tool
+            if current_step.tool_name == "generate_email":
+                tool_args["session_id"] = session_id
+            # Add recipients for add_contacts_to_cadence if missing
+            elif (
+                current_step.tool_name == "add_contacts_to_cadence"
+                and "recipients_ids" not in tool_args
+            ):
+                # Try to get contact IDs from previous search results
+                for step_id, result in step_results.items():
+                    if isinstance(result, dict) and "contacts" in result:
+                        contact_ids = [
+                            c.get("id")
+                            for c in result.get("contacts", [])
+                            if c.get("id")
+                        ]
+                        if contact_ids:
+                            tool_args["recipients_ids"] = contact_ids[
+                                :20
+                            ]  # Limit to 20 contacts
+                            break
+
+            # Filter out invalid parameters using existing validation
+            tool_args = self._validate_and_filter_tool_args(
+                current_step.tool_name, tool_args
+            )
+            result = await tool_func(**tool_args)
+        else:
+            # Add session_id for email generation tool
+            if current_step.tool_name == "generate_email":
+                tool_args["session_id"] = session_id
+            # Add recipients for add_contacts_to_cadence if missing
+            elif (
+                current_step.tool_name == "add_contacts_to_cadence"
+                and "recipients_ids" not in tool_args
+            ):
+                # Try to get contact IDs from previous search results
+                for step_id, result in step_results.items():
+                    if isinstance(result, dict) and "contacts" in result:
+                        contact_ids = [
+                            c.get("id")
+                            for c in result.get("contacts", [])
+                            if c.get("id")
+                        ]
+                        if contact_ids:
+                            tool_args["recipients_ids"] = contact_ids
+                            break
+
+            # Filter out invalid parameters using existing validation
+            tool_args = self._validate_and_filter_tool_args(
+                current_step.tool_name, tool_args
+            )
+            # Run blocking tools off the event loop so batches stay concurrent
+            result = await asyncio.to_thread(tool_func, **tool_args)
+
+        return result
+
     def _check_completion_node(self, state: AgentState) -> AgentState:
         """Checks if the execution plan is complete and aggregates the final results."""
         print("🔍 Checking execution completion")
@@ -1253,10 +1497,36 @@ class LangGraphSalesAgent:
             )
             return {}
 
-    async def _create_execution_plan(
-        self, session_id: str, tool_calls: List[Dict], messages: List[Dict]
-    ) -> ExecutionPlan:
-        """Simplified execution plan creation - let analyzer handle all logic"""
+    @staticmethod
+    def _tool_call_outline(
+        tool_calls: List[Dict], with_arguments: bool = False
+    ) -> List[Dict]:
+        """
+        Snapshots tool calls as names (and optionally the arguments as the
+        model wrote them), keeping their order.
+
+        Missing-tools detection and dependency analysis run while enum mapping
+        is still rewriting the calls in place, so they get their own copies.
+        Dependency analysis needs the arguments: whether a leads search is
+        scoped to the companies another step finds is only visible there.
+        """
+        outline = []
+        for call in tool_calls:
+            function = call.get("function", {})
+            entry = {"name": function.get("name", "unknown")}
+            if with_arguments:
+                entry["arguments"] = function.get("arguments", "{}")
+            outline.append({"function": entry})
+        return outline
+
+    async def _analyze_plan_dependencies(
+        self,
+        session_id: str,
+        tool_calls: List[Dict],
+        messages: List[Dict],
+        context_info: Dict,
+    ) -> Dict:
+        """Runs the execution type/dependency analysis for a set of tool calls."""
         # Get the last 3 user messages (or fewer if not enough)
         user_messages = [
             msg.get("content", "") for msg in messages if msg.get("role") == "user"
@@ -1264,13 +1534,30 @@ class LangGraphSalesAgent:
         # Ensure last_user_messages is a single string (concatenated if multiple)
         last_user_messages = " ".join(user_messages[-3:]) if user_messages else ""
 
-        # Get context from previous tool outputs
-        context_info = self._build_context_from_history(session_id)
-
         # Get analysis from ExecutionTypeAnalyzer
-        analysis = await self.execution_analyzer.determine_execution_type(
+        return await self.execution_analyzer.determine_execution_type(
             session_id, last_user_messages, tool_calls, context_info
         )
+
+    async def _create_execution_plan(
+        self,
+        session_id: str,
+        tool_calls: List[Dict],
+        messages: List[Dict],
+        context_info: Dict = None,
+        analysis: Dict = None,
+    ) -> ExecutionPlan:
+        """
+        Simplified execution plan creation - let analyzer handle all logic.
+        `analysis` may be passed in when it was computed concurrently.
+        """
+        if analysis is None:
+            if context_info is None:
+                # Get context from previous tool outputs
+                context_info = self._build_context_from_history(session_id)
+            analysis = await self._analyze_plan_dependencies(
+                session_id, tool_calls, messages, context_info
+            )
         print(f"🧠 Execution type analysis:")
         print(f"   Raw analysis: {json.dumps(analysis, indent=2)}")
 
@@ -1524,6 +1811,14 @@ class LangGraphSalesAgent:
         assistant_message = state["messages"][-1]
         return "plan" if assistant_message.get("tool_calls") else "respond"
 
+    def _route_plan_approval(self, state: AgentState) -> str:
+        """Skips the review interrupt for plans the approval policy allows."""
+        if state.get("execution_plan") and state.get("execution_progress", {}).get(
+            "auto_approved"
+        ):
+            return "execute"
+        return "review"
+
     def _should_continue_execution(self, state: AgentState) -> str:
         """Determains if there are more steps to execute."""
         execution_plan_data = state.get("execution_plan")
@@ -1841,18 +2136,20 @@ class LangGraphSalesAgent:
         self, tool_output: dict, node_name: str = "execute_step", status: str = None
     ) -> dict:
         """Helper method to create consistent progress streaming events."""
+        # Tools may return None or non-dict results; never let that end the stream
+        result = tool_output.get("result")
+        if not isinstance(result, dict):
+            result = {}
         if status is None:
-            status = (
-                "completed"
-                if "error" not in tool_output.get("result", {})
-                else "failed"
-            )
+            status = "completed" if "error" not in result else "failed"
 
         # Set appropriate message based on status
         if status == "failed":
-            message = tool_output.get("result", {}).get("error", "")
+            message = result.get("error", "")
         elif status == "running":
             message = f"Executing {tool_output.get('tool_name', 'unknown tool')}"
+        elif status in ("skipped", "cancelled"):
+            message = tool_output.get("reason", "")
         else:  # completed
             message = f"Completed {tool_output.get('tool_name', 'unknown tool')}"
 
@@ -1867,7 +2164,7 @@ class LangGraphSalesAgent:
         if status == "completed":
             result_summary = tool_output.get(
                 "summary", {}
-            ) or self._create_result_summary(tool_output.get("result", {}))
+            ) or self._create_result_summary(result)
             if result_summary:
                 progress_data["result_summary"] = result_summary
 
@@ -1939,6 +2236,9 @@ class LangGraphSalesAgent:
 
         if is_resuming:
             if message.startswith("EDIT_PLAN:"):
+                if self.plan_speculator is not None:
+                    # Results of the reviewed plan must not leak into the edit
+                    self.plan_speculator.discard(thread_id)
                 try:
                     plan_json = message[10:]
                     edited_plan_data = json.loads(plan_json)
@@ -1994,7 +2294,14 @@ class LangGraphSalesAgent:
                 "plan_id": plan_id,  # Include plan_id for new workflows
             }
 
-        async for event in self.workflow.astream(inputs, config=config):
+        async for stream_mode, event in self.workflow.astream(
+            inputs, config=config, stream_mode=["updates", "custom"]
+        ):
+            if stream_mode == "custom":
+                # Token deltas and other events pushed from inside nodes
+                yield event
+                continue
+
             node_name = list(event.keys())[0]
             node_output = event[node_name]
 
@@ -2019,20 +2326,36 @@ class LangGraphSalesAgent:
                     print(
                         f"🔍 DEBUG: Final review event structure: {review_event.keys()}"
                     )
+                    if self.plan_speculator is not None and plan_id:
+                        # Started before yielding: the client may disconnect
+                        # once it has the plan
+                        self.plan_speculator.start(
+                            plan_id,
+                            ExecutionPlan.from_serializable(plan_data),
+                            session_id,
+                        )
                     yield review_event
                 # The graph is now paused, waiting for the next `chat` call.
 
+            elif node_name == "plan_execution":
+                progress = (node_output or {}).get("execution_progress", {})
+                if progress.get("auto_approved"):
+                    # Execution continues in this same stream
+                    yield {
+                        "type": "plan_auto_approved",
+                        "plan": node_output.get("execution_plan"),
+                        "plan_id": progress.get("plan_id"),
+                        "message": "Plan only reads data, executing without review",
+                        "session_id": session_id,
+                    }
+
             elif node_name == "execute_step":
-                # Stream progress for each tool output from the step.
+                # Per-step progress was already streamed live from the node
+                # through the custom stream as each step started/finished.
                 tool_outputs = node_output.get("tool_outputs", [])
                 print(
                     f"🔍 DEBUG: execute_step node returned {len(tool_outputs)} tool outputs"
                 )
-                for i, tool_output in enumerate(tool_outputs):
-                    print(
-                        f"🔍 DEBUG: Streaming tool output {i}: {tool_output.get('tool_name', 'unknown')}"
-                    )
-                    yield self._stream_progress(tool_output, node_name)
 
             elif node_name == "respond":
                 # The graph has finished. The `final_result` should be complete.
@@ -2727,14 +3050,8 @@ Validate these arguments. Remove any that are irrelevant, empty, or don't make s
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_content},
                 ],
-                model_preference_list=[
-                    "openai/gpt-4o-mini",
-                    "mistralai/mistral-small-3.2-24b-instruct",
-                    "openai/gpt-4o-mini",
-                ],
                 response_format=ResponseFormat.JSON,
                 temperature=0.0,  # More deterministic for validation
-                max_retries_per_model=1,
             )
 
             print(f"🔧 Validation API response received: {bool(response)}")
@@ -2921,13 +3238,8 @@ Rules:
                     },
                     {"role": "user", "content": batch_prompt},
                 ],
-                model_fallbacks=[
-                    "mistralai/mistral-small-3.2-24b-instruct",
-                    "anthropic/claude-3-haiku",
-                ],
                 response_format=ResponseFormat.JSON,
                 temperature=0.1,
-                max_retries=2,
             )
 
             if response and "choices" in response:
@@ -3147,53 +3459,48 @@ Rules:
         return cleaned_args
 
     def _check_and_skip_empty_searches(
-        self, current_step, result, execution_plan, completed_steps
-    ):
+        self, current_step, result, scheduler: DagScheduler
+    ) -> List[str]:
         """
-        Check if a search tool returned empty results and mark related searches for skipping
-        to avoid unnecessary API calls.
-        """
-        if not execution_plan or not execution_plan.steps:
-            return
+        Check if a search tool returned empty results and skip the independent
+        searches of the other kind that have not started yet, to avoid
+        unnecessary API calls.
 
-        # Check if current step is a search tool that returned empty results
+        Returns:
+            The step ids that were skipped (including dependants that used
+            their results)
+        """
+        skipped = []
         if current_step.tool_name == "search_leads":
             # Check if contacts were found
             contacts = result.get("contacts", []) if isinstance(result, dict) else []
-            if not contacts:
-                print(
-                    f"🚫 No contacts found in {current_step.step_id}, marking search_companies steps for skipping"
-                )
-                # Mark any search_companies steps for skipping
-                for step in execution_plan.steps:
-                    if (
-                        step.tool_name == "search_companies"
-                        and step.step_id not in completed_steps
-                        and not step.depends_on
-                    ):  # Only skip independent company searches
-                        step.skip_reason = "No contacts found to warrant company search"
-                        print(
-                            f"  - Marking {step.get('step_id')} (search_companies) for skipping"
-                        )
+            if contacts:
+                return skipped
+            print(
+                f"🚫 No contacts found in {current_step.step_id}, skipping search_companies steps"
+            )
+            skip_tool = "search_companies"
+            reason = "No contacts found to warrant company search"
 
         elif current_step.tool_name == "search_companies":
             # Check if companies were found
             companies = result.get("companies", []) if isinstance(result, dict) else []
-            if not companies:
-                print(
-                    f"🚫 No companies found in {current_step.step_id}, marking search_leads steps for skipping"
-                )
-                # Mark any search_leads steps for skipping
-                for step in execution_plan.steps:
-                    if (
-                        step.tool_name == "search_leads"
-                        and step.step_id not in completed_steps
-                        and not step.depends_on
-                    ):  # Only skip independent lead searches
-                        step.skip_reason = "No companies found to warrant lead search"
-                        print(
-                            f"  - Marking {step.get('step_id')} (search_leads) for skipping"
-                        )
+            if companies:
+                return skipped
+            print(
+                f"🚫 No companies found in {current_step.step_id}, skipping search_leads steps"
+            )
+            skip_tool = "search_leads"
+            reason = "No companies found to warrant lead search"
+
+        else:
+            return skipped
+
+        for step in scheduler.plan.steps:
+            # Only skip independent searches; skip() ignores started steps
+            if step.tool_name == skip_tool and not step.depends_on:
+                skipped.extend(scheduler.skip(step.step_id, reason))
+        return skipped
 
     def _validate_arguments_against_context(
         self, tool_name: str, args: dict, user_message: str
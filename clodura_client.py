@@ -1,6 +1,6 @@
 import httpx
 import json
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from urllib.parse import urljoin
 from mongo_client import MongoClient
 
@@ -16,6 +16,7 @@ class CloduraClient:
         api_key: str,
         user_id: Optional[str] = None,
         mongo_client: Optional[MongoClient] = None,
+        transport_factory: Optional[Callable[[], httpx.AsyncBaseTransport]] = None,
     ):
         """
         Initialize the Clodura client
@@ -24,6 +25,8 @@ class CloduraClient:
             base_url: Base URL for the API (e.g., https://app.clodura.ai)
             api_key: API key for authentication
             user_id: Optional user ID (can be set later or passed in methods)
+            transport_factory: Builds the httpx transport per request
+                (e.g. record/replay); defaults to the network transport
         """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
@@ -34,6 +37,7 @@ class CloduraClient:
             "Authorization": f"Bearer {self.api_key}",
         }
         self.mongo_client = mongo_client
+        self.transport_factory = transport_factory
 
     async def _make_request(
         self,
@@ -56,7 +60,8 @@ class CloduraClient:
         """
         url = urljoin(self.base_url, endpoint)
         try:
-            async with httpx.AsyncClient() as client:
+            transport = self.transport_factory() if self.transport_factory else None
+            async with httpx.AsyncClient(transport=transport) as client:
                 response = await client.request(
                     method=method,
                     url=url,
@@ -126,6 +131,21 @@ class CloduraClient:
             }
 
     # Company Search Methods
+    async def company_name_typeahead(self, name: str) -> Any:
+        """
+        Looks up company name suggestions
+
+        Args:
+            name: Company name as the user typed it
+
+        Returns:
+            List of suggested companies (or an error dict)
+        """
+        return await self._make_request(
+            method="GET",
+            endpoint=f"/api/search/typeahead/service/company_name/{name}",
+        )
+
     async def search_companies(
         self, body: Dict[str, Any], params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
@@ -375,6 +375,7 @@ Use structured format with headers. Be concise but complete.""",
         try:
             response = await self.openrouter_client.chat_completion(
                 session_id=session_id,
+                purpose="conversation_compression",
                 messages=compression_prompt,
                 model="openai/gpt-4o-mini",  # Fast, cheap model for compression
                 max_tokens=400,
@@ -1,8 +1,7 @@
+import difflib
 import json
 from typing import Dict, List, Optional
 import json
-import httpx
-import os
 
 
 def match_size(value: str):
@@ -51,23 +50,19 @@ def get_industry(industryName: str) -> Dict:
     return None
 
 
-def match_company_via_api(raw_values: List[str]) -> List[Dict[str, str]]:
-    CLODURA_API_TOKEN = os.getenv("CLODURA_TOKEN")
-    headers = {
-        "Authorization": f"Bearer {CLODURA_API_TOKEN}",
-        "Accept": "application/json",
-    }
-
+async def match_company_via_api(
+    raw_values: List[str], clodura_client
+) -> List[Dict[str, str]]:
+    """
+    Resolves company names through the Clodura typeahead, via the given
+    CloduraClient so the lookups share its transport (and record/replay).
+    """
     all_matched = []
 
     for raw_value in raw_values:
 
         try:
-            url = f"https://app.clodura.ai/api/search/typeahead/service/company_name/{raw_value}"
-            with httpx.Client(timeout=5) as client:
-                response = client.get(url, headers=headers)
-                response.raise_for_status()
-                suggestions = response.json()
+            suggestions = await clodura_client.company_name_typeahead(raw_value)
 
             if not isinstance(suggestions, list) or not suggestions:
                 continue
@@ -171,3 +166,251 @@ def enum_data_loader() -> Dict:
             entry["type"] for entry in company_types if not entry.get("exclude")
         ]
     }
+
+
+# Abbreviations and phrases the search LLM tends to pass through verbatim.
+# Targets that are not valid enum values are ignored. Keep these tight:
+# broad words ("services", "media") are left to the LLM mapper rather than
+# expanded to whole industry groups, which would silently widen searches.
+ENUM_ALIASES: Dict[str, Dict[str, List[str]]] = {
+    "industry": {
+        "bfsi": ["Banking", "Financial Services", "Insurance"],
+        "f&b": [
+            "Food and Beverage Manufacturing",
+            "Food and Beverage Retail",
+            "Food and Beverage Services",
+        ],
+        "fnb": [
+            "Food and Beverage Manufacturing",
+            "Food and Beverage Retail",
+            "Food and Beverage Services",
+        ],
+        "ites": ["IT Services and IT Consulting"],
+        "it": ["IT Services and IT Consulting"],
+        "it services": ["IT Services and IT Consulting"],
+        "fintech": ["Financial Services", "Technology, Information and Internet"],
+        "edtech": ["Education", "E-Learning Providers"],
+        "pharma": ["Pharmaceutical Manufacturing"],
+        "saas": ["Software Development"],
+        "software": ["Software Development"],
+        "automotive": ["Motor Vehicle Manufacturing"],
+        "telecom": ["Telecommunications"],
+        "bpo": ["Outsourcing and Offshoring Consulting"],
+        "consulting": ["Business Consulting and Services"],
+        "healthcare": ["Hospitals and Health Care"],
+    },
+    "seniority": {
+        "decision makers": [
+            "CEO",
+            "CXO",
+            "President",
+            "Founder",
+            "Vice President",
+            "Director",
+        ],
+        "c-level": ["CEO", "CXO"],
+        "c-suite": ["CEO", "CXO"],
+        "cto": ["CXO"],
+        "cfo": ["CXO"],
+        "cmo": ["CXO"],
+        "coo": ["CXO"],
+        "cio": ["CXO"],
+        "vp": ["Vice President"],
+        "vps": ["Vice President"],
+        "co-founder": ["Founder"],
+        "cofounder": ["Founder"],
+    },
+    "functionalLevel": {
+        "procurement": ["Purchase"],
+        "purchasing": ["Purchase"],
+        "human resources": ["HR"],
+        "talent acquisition": ["Hiring"],
+        "recruitment": ["Hiring"],
+        "information technology": ["IT"],
+        "customer support": ["Support", "Customer Service"],
+    },
+}
+
+
+def _normalize_term(value: str) -> str:
+    text = value.lower().replace("&", " and ").replace("_", " ")
+    # Spacing is dropped too, so "51-200" matches "51 - 200"
+    return "".join(ch for ch in text if ch.isalnum() or ch in "+<-")
+
+
+# Words that say nothing about which enum value is meant
+_FILLER_WORDS = frozenset(
+    {
+        "and",
+        "of",
+        "the",
+        "in",
+        "companies",
+        "company",
+        "firms",
+        "firm",
+        "industry",
+        "sector",
+        "businesses",
+        "business",
+    }
+)
+
+
+def _tokens(value: str) -> List[str]:
+    words = "".join(ch if ch.isalnum() else " " for ch in value.lower()).split()
+    return [word for word in words if len(word) >= 3 and word not in _FILLER_WORDS]
+
+
+def _token_key(value: str) -> frozenset:
+    """Whole words of a term, order-insensitive, with plural "s" dropped"""
+    words = "".join(
+        ch if ch.isalnum() else " " for ch in value.lower().replace("&", " and ")
+    ).split()
+    return frozenset(
+        word[:-1] if len(word) > 3 and word.endswith("s") else word
+        for word in words
+        if word != "and"
+    )
+
+
+# Fields whose values are ranges or ordered stages: a near miss there is a
+# different bucket ("1-50" is not "11 - 50"), so only exact matches count
+RANGE_FIELDS = frozenset({"size", "revenue", "fundingType"})
+
+
+class EnumResolver:
+    """
+    Maps search terms to valid enum values without an LLM.
+
+    Each term is tried as an exact value, then case/punctuation-insensitively,
+    then through the curated aliases, and finally by the same whole words in
+    any order (never for range fields). Terms that none of these resolve are
+    left for the LLM.
+    """
+
+    def __init__(
+        self,
+        enum_data: Dict[str, List[str]],
+        aliases: Optional[Dict[str, Dict[str, List[str]]]] = None,
+    ):
+        """
+        Args:
+            enum_data: Valid values per field, as returned by enum_data_loader
+            aliases: Alias tables per field (defaults to ENUM_ALIASES)
+        """
+        self.enum_data = enum_data
+        self._by_tokens: Dict[str, Dict[frozenset, str]] = {
+            field: {_token_key(value): value for value in values}
+            for field, values in enum_data.items()
+            if not self._is_range_field(field, values)
+        }
+        self._normalized: Dict[str, Dict[str, str]] = {
+            field: {_normalize_term(value): value for value in values}
+            for field, values in enum_data.items()
+        }
+        self._aliases: Dict[str, Dict[str, List[str]]] = {}
+        for field, table in (ENUM_ALIASES if aliases is None else aliases).items():
+            valid = set(enum_data.get(field, []))
+            self._aliases[field] = {
+                _normalize_term(alias): [value for value in targets if value in valid]
+                for alias, targets in table.items()
+            }
+
+    @staticmethod
+    def _is_range_field(field: str, values: List[str]) -> bool:
+        return field in RANGE_FIELDS or any(
+            any(ch.isdigit() for ch in value) for value in values
+        )
+
+    def resolve(self, field: str, value) -> Optional[List[str]]:
+        """Returns the enum values a term maps to, or None if unresolved"""
+        if not isinstance(value, str) or field not in self.enum_data:
+            return None
+        if value in self.enum_data[field]:
+            return [value]
+
+        normalized = _normalize_term(value)
+        candidates = [normalized]
+        if normalized.endswith("s"):
+            candidates.append(normalized[:-1])  # "Directors" -> "director"
+        for term in candidates:
+            exact = self._normalized[field].get(term)
+            if exact is not None:
+                return [exact]
+            aliased = self._aliases.get(field, {}).get(term)
+            if aliased:
+                return list(aliased)
+
+        reordered = self._by_tokens.get(field, {}).get(_token_key(value))
+        if reordered is not None:
+            return [reordered]
+        return None
+
+    def resolve_fields(self, fields: Dict[str, List]) -> tuple:
+        """
+        Resolves every term of every field.
+
+        Returns:
+            (resolved, unresolved): enum values found locally per field, and
+            the terms per field that still need mapping
+        """
+        resolved: Dict[str, List[str]] = {}
+        unresolved: Dict[str, List] = {}
+        for field, values in fields.items():
+            for value in values:
+                matches = self.resolve(field, value)
+                if matches is None:
+                    unresolved.setdefault(field, []).append(value)
+                    continue
+                field_values = resolved.setdefault(field, [])
+                field_values.extend(m for m in matches if m not in field_values)
+        return resolved, unresolved
+
+    def candidates(self, field: str, term: str, limit: int = 12) -> List[str]:
+        """
+        The `limit` valid values lexically closest to a term, best first
+        (all values when the field is that small), to keep mapping prompts
+        short.
+        """
+        values = self.enum_data.get(field, [])
+        if len(values) <= limit:
+            return list(values)
+
+        term_tokens = _tokens(term)
+        compact = _normalize_term(term)
+        aliased = set(self._aliases.get(field, {}).get(compact, []))
+
+        def score(value: str) -> float:
+            if value in aliased:
+                return 3.0
+            value_tokens = _tokens(value)
+            overlap = sum(
+                1
+                for token in term_tokens
+                if any(
+                    v.startswith(token[:4]) or token.startswith(v[:4])
+                    for v in value_tokens
+                )
+            ) / max(len(term_tokens), 1)
+            ratio = difflib.SequenceMatcher(
+                None, compact, _normalize_term(value)
+            ).ratio()
+            # Shared words dominate; character similarity breaks ties and
+            # catches misspellings
+            return overlap + 0.5 * ratio
+
+        return sorted(values, key=score, reverse=True)[:limit]
+
+    def validate(self, field: str, values) -> List[str]:
+        """Keeps the values that are (case-insensitively) valid for a field"""
+        if not isinstance(values, list):
+            values = [values]
+        valid = []
+        for value in values:
+            if not isinstance(value, str):
+                continue
+            match = self._normalized.get(field, {}).get(_normalize_term(value))
+            if match is not None and match not in valid:
+                valid.append(match)
+        return valid
@@ -1,6 +1,12 @@
+import hashlib
+import heapq
 import json
-from typing import List, Dict
+from enum import Enum
+from typing import Callable, Iterable, List, Dict, Optional
 from LLM.open_router_client import OpenRouterClient, ResponseFormat
+from semantic_cache import SemanticCache
+from missing_tools_classifier import classify_missing_tools, intent_flags
+from tool_contracts import infer_dependencies
 
 
 class ExecutionTypeAnalyzer:
@@ -8,8 +14,58 @@ class ExecutionTypeAnalyzer:
     Comprehensive analyzer that determines execution type and dependencies
     """
 
-    def __init__(self, openrouter_client: OpenRouterClient):
+    def __init__(
+        self,
+        openrouter_client: OpenRouterClient,
+        semantic_cache: Optional[SemanticCache] = None,
+    ):
         self.client = openrouter_client
+        self.semantic_cache = semantic_cache
+
+    def _planner_cache_scope(
+        self,
+        purpose: str,
+        tool_calls: List[Dict],
+        context_info: Dict = None,
+        include_arguments: bool = False,
+        user_message: Optional[str] = None,
+    ) -> tuple:
+        """
+        Builds the exact-match part of a semantic cache key: the tools called
+        (in step order) and which kinds of previous results are available.
+
+        With `include_arguments`, a hash of each call's arguments is part of
+        the scope too, for decisions that hinge on them (a leads search
+        scoped to "their companies" or not) rather than on the wording.
+        With `user_message`, its intent flags (see `intent_flags`) are too,
+        so "a new cadence" never reuses the answer for "my Q3 cadence".
+        """
+        summary_data = (context_info or {}).get("summary_data", {})
+        calls = tuple(call["function"]["name"] for call in tool_calls)
+        if include_arguments:
+            calls = tuple(
+                (name, self._arguments_digest(call))
+                for name, call in zip(calls, tool_calls)
+            )
+        return (
+            purpose,
+            calls,
+            bool(summary_data.get("contact_ids")),
+            bool(summary_data.get("company_ids") or summary_data.get("company_names")),
+            bool(summary_data.get("email_content")),
+            bool(summary_data.get("cadence_id")),
+            intent_flags(user_message) if user_message is not None else None,
+        )
+
+    @staticmethod
+    def _arguments_digest(tool_call: Dict) -> str:
+        """Order-insensitive hash of a tool call's arguments"""
+        arguments = tool_call["function"].get("arguments") or "{}"
+        try:
+            arguments = json.dumps(json.loads(arguments), sort_keys=True)
+        except (TypeError, ValueError):
+            pass
+        return hashlib.sha256(arguments.encode("utf-8")).hexdigest()[:16]
 
     async def determine_execution_type(
         self,
@@ -41,7 +97,24 @@ class ExecutionTypeAnalyzer:
         tool_calls: List[Dict],
         context_info: Dict = None,
     ) -> Dict:
-        """Uses LLM to analyze tool dependencies"""
+        """
+        Derives tool dependencies from the tool contracts, falling back to the
+        LLM only when the contracts cannot decide
+        """
+        rule_based = infer_dependencies(tool_calls, context_info)
+        if rule_based is not None:
+            print(f"🧭 Dependencies from tool contracts: {rule_based['dependencies']}")
+            return rule_based
+        print("🧭 Dependencies ambiguous from contracts, asking the LLM")
+
+        cache_scope = self._planner_cache_scope(
+            "analyze_dependencies", tool_calls, context_info, include_arguments=True
+        )
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.lookup(cache_scope, user_message)
+            if cached is not None:
+                return cached
+
         analysis_prompt = self._build_dependency_analysis_prompt(
             user_message, tool_calls, context_info
         )
@@ -49,15 +122,9 @@ class ExecutionTypeAnalyzer:
             session_id=session_id,
             purpose="analyze_dependencies",
             messages=analysis_prompt,
-            model_fallbacks=[
-                "openai/gpt-4o-mini",
-                "qwen/qwen3-235b-a22b",
-                "openai/gpt-4o-mini",
-            ],
             response_format=ResponseFormat.JSON,
             temperature=0.1,
             prefer_provider="DeepInfra",
-            max_retries_per_model=1,
         )
 
         if response:
@@ -75,6 +142,8 @@ class ExecutionTypeAnalyzer:
                     if "dependencies" in result:
                         result = self._fix_circular_dependencies(result, tool_calls)
 
+                    if self.semantic_cache is not None:
+                        self.semantic_cache.add(cache_scope, user_message, result)
                     return result
 
             except json.JSONDecodeError as e:
@@ -97,10 +166,26 @@ class ExecutionTypeAnalyzer:
         context_info: Dict = None,
     ) -> Dict:
         """
-        Checks if the LLM missed any tools that the user requested
+        Checks if the LLM missed any tools that the user requested. Clear-cut
+        requests are answered by the local classifier; only ambiguous ones
+        reach the LLM.
         """
         current_tools = [call["function"]["name"] for call in tool_calls]
 
+        local_result = classify_missing_tools(user_message, current_tools, context_info)
+        if local_result is not None:
+            print(f"🧭 Missing tools from local rules: {local_result['missing_tools']}")
+            return local_result
+        print("🧭 Missing tools ambiguous locally, asking the LLM")
+
+        cache_scope = self._planner_cache_scope(
+            "check_missing_tools", tool_calls, context_info, user_message=user_message
+        )
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.lookup(cache_scope, user_message)
+            if cached is not None:
+                return cached
+
         system_message = (
             "You are an expert at analyzing user requests for sales workflows. Your job is to determine if the LLM missed any required tools.\n\n"
             "## Available Tools:\n"
@@ -201,15 +286,8 @@ class ExecutionTypeAnalyzer:
                     {"role": "system", "content": system_message},
                     {"role": "user", "content": user_content},
                 ],
-                model_fallbacks=[
-                    "anthropic/claude-3.5-sonnet",
-                    "qwen/qwen3-235b-a22b",
-                    "openai/gpt-4o",
-                    "openai/gpt-4o-mini",
-                ],
                 response_format=ResponseFormat.JSON,
                 temperature=0.1,
-                max_retries_per_model=1,
             )
 
             if response:
@@ -221,6 +299,8 @@ class ExecutionTypeAnalyzer:
                     if json_start != -1 and json_end > json_start:
                         json_string = content[json_start:json_end]
                         result = json.loads(json_string)
+                        if self.semantic_cache is not None:
+                            self.semantic_cache.add(cache_scope, user_message, result)
                         return result
 
                 except json.JSONDecodeError:
@@ -522,9 +602,11 @@ class ExecutionTypeAnalyzer:
         tool_info = []
         for i, tool_call in enumerate(tool_calls):
             tool_name = tool_call["function"]["name"]
-            tool_args = tool_call["function"]["arguments"]
+            tool_args = tool_call["function"].get("arguments")
             tool_info.append(f"**step_{i}**: {tool_name}")
-            tool_info.append(f"Arguments: {tool_args}")
+            # Name-only outlines carry no arguments to print
+            if tool_args:
+                tool_info.append(f"Arguments: {tool_args}")
 
         user_content = (
             f"## User Request:\n"
@@ -574,22 +656,12 @@ class ExecutionPlan:
         self.step_map = {step.step_id: step for step in steps}
 
     def get_ready_steps(self, completed_steps: List[str]) -> List[ExecutionStep]:
-        """Gets all steps whose dependencies have been met."""
-        ready = []
-        completed_set = set(completed_steps)
-        for step in self.steps:
-            if step.step_id not in completed_set:
-                # Check if step is marked for skipping
-                if hasattr(step, "skip_reason") and step.skip_reason:
-                    print(f"🚫 Skipping {step.step_id}: {step.skip_reason}")
-                    # Mark as completed to prevent blocking other steps
-                    completed_set.add(step.step_id)
-                    completed_steps.append(step.step_id)
-                    continue
-
-                if all(dep in completed_set for dep in step.depends_on):
-                    ready.append(step)
-        return ready
+        """
+        Gets all steps whose dependencies have been met, longest critical
+        path first. Skipped steps count as met; `completed_steps` is not
+        modified.
+        """
+        return DagScheduler(self, completed_steps).peek_ready()
 
     def is_complete(self, completed_steps: List[str]) -> bool:
         """Checks if all steps in the plan have been completed."""
@@ -652,3 +724,227 @@ class ExecutionPlan:
             execution_type=data.get("execution_type", "sequential"),
             description=data.get("description", "Execution plan"),
         )
+
+
+class StepState(Enum):
+    """Lifecycle of a step while a plan runs"""
+
+    PENDING = "pending"  # waiting on dependencies
+    READY = "ready"  # dependencies met, not started
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # deliberately not run (e.g. nothing to search for)
+    CANCELLED = "cancelled"  # a dependency failed or can never finish
+
+
+TERMINAL_STATES = frozenset(
+    {StepState.COMPLETED, StepState.FAILED, StepState.SKIPPED, StepState.CANCELLED}
+)
+
+
+class DagScheduler:
+    """
+    Indegree-based scheduler for an ExecutionPlan.
+
+    Dependency counts and dependant lists are built once, so finishing a
+    step only touches its direct dependants instead of rescanning the plan.
+    Ready steps are handed out longest critical path first, which keeps the
+    chain that bounds the plan's makespan moving while shorter branches
+    fill the remaining slots. A failed step cancels everything downstream
+    of it; a skipped step also skips the dependants that consume its
+    results and releases the rest.
+    """
+
+    def __init__(
+        self,
+        plan: ExecutionPlan,
+        finished_steps: Iterable[str] = (),
+        cost: Optional[Callable[[ExecutionStep], float]] = None,
+    ):
+        """
+        Args:
+            plan: The plan to schedule
+            finished_steps: Step ids already processed in an earlier run
+            cost: Estimated duration of a step for critical-path ordering
+                (every step counts as 1 by default)
+        """
+        self.plan = plan
+        self.states: Dict[str, StepState] = {}
+        self.reasons: Dict[str, str] = {}
+        self._indegree: Dict[str, int] = {}
+        self._dependants: Dict[str, List[str]] = {
+            step.step_id: [] for step in plan.steps
+        }
+        self._position = {step.step_id: i for i, step in enumerate(plan.steps)}
+        self._ready: List[tuple] = []
+
+        for step in plan.steps:
+            dependencies = []
+            for dep in dict.fromkeys(step.depends_on):
+                if dep == step.step_id or dep not in plan.step_map:
+                    print(f"⚠️ Ignoring unknown dependency {dep} of {step.step_id}")
+                    continue
+                dependencies.append(dep)
+                self._dependants[dep].append(step.step_id)
+            self._indegree[step.step_id] = len(dependencies)
+            self.states[step.step_id] = StepState.PENDING
+
+        self.priority = self._critical_path_lengths(cost or (lambda step: 1.0))
+
+        for step in plan.steps:
+            if self._indegree[step.step_id] == 0:
+                self._make_ready(step.step_id)
+        for step_id in finished_steps:
+            if step_id in self.states and not self.is_terminal(step_id):
+                self.complete(step_id)
+        for step in plan.steps:
+            skip_reason = getattr(step, "skip_reason", None)
+            if skip_reason and not self.is_terminal(step.step_id):
+                self.skip(step.step_id, skip_reason)
+
+    def _critical_path_lengths(
+        self, cost: Callable[[ExecutionStep], float]
+    ) -> Dict[str, float]:
+        """Longest cost-weighted path from each step to the end of the plan"""
+        indegree = dict(self._indegree)
+        order = [step_id for step_id, count in indegree.items() if count == 0]
+        for step_id in order:  # Kahn's algorithm; `order` grows as we go
+            for dependant in self._dependants[step_id]:
+                indegree[dependant] -= 1
+                if indegree[dependant] == 0:
+                    order.append(dependant)
+
+        # Steps on a cycle never reach indegree 0 and keep their own cost
+        lengths = {
+            step_id: cost(self.plan.step_map[step_id]) for step_id in self.states
+        }
+        for step_id in reversed(order):
+            downstream = [lengths[d] for d in self._dependants[step_id]]
+            if downstream:
+                lengths[step_id] += max(downstream)
+        return lengths
+
+    def _make_ready(self, step_id: str):
+        self.states[step_id] = StepState.READY
+        heapq.heappush(
+            self._ready,
+            (-self.priority[step_id], self._position[step_id], step_id),
+        )
+
+    def is_terminal(self, step_id: str) -> bool:
+        return self.states[step_id] in TERMINAL_STATES
+
+    def peek_ready(self) -> List[ExecutionStep]:
+        """Ready steps in dispatch order, without starting them"""
+        return [
+            self.plan.step_map[step_id]
+            for _, _, step_id in sorted(self._ready)
+            if self.states[step_id] == StepState.READY
+        ]
+
+    def start_ready(self, limit: Optional[int] = None) -> List[ExecutionStep]:
+        """Marks up to `limit` ready steps as running and returns them"""
+        started = []
+        while self._ready and (limit is None or len(started) < limit):
+            _, _, step_id = heapq.heappop(self._ready)
+            if self.states[step_id] != StepState.READY:
+                continue  # skipped or cancelled after becoming ready
+            self.states[step_id] = StepState.RUNNING
+            started.append(self.plan.step_map[step_id])
+        return started
+
+    def _release_dependants(self, step_id: str) -> List[str]:
+        """Decrements dependant indegrees; returns the steps made ready"""
+        released = []
+        for dependant in self._dependants[step_id]:
+            self._indegree[dependant] -= 1
+            if (
+                self._indegree[dependant] == 0
+                and self.states[dependant] == StepState.PENDING
+            ):
+                self._make_ready(dependant)
+                released.append(dependant)
+        return released
+
+    def complete(self, step_id: str) -> List[str]:
+        """Marks a step completed; returns the steps it made ready"""
+        self.states[step_id] = StepState.COMPLETED
+        return self._release_dependants(step_id)
+
+    def fail(self, step_id: str, reason: str) -> List[str]:
+        """Marks a step failed; returns the downstream steps it cancelled"""
+        self.states[step_id] = StepState.FAILED
+        self.reasons[step_id] = reason
+        return self._cancel_downstream(
+            step_id, f"Dependency '{step_id}' failed: {reason}"
+        )
+
+    def _cancel_downstream(self, step_id: str, reason: str) -> List[str]:
+        cancelled = []
+        stack = list(self._dependants[step_id])
+        while stack:
+            dependant = stack.pop()
+            if (
+                self.is_terminal(dependant)
+                or self.states[dependant] == StepState.RUNNING
+            ):
+                continue
+            self.states[dependant] = StepState.CANCELLED
+            self.reasons[dependant] = reason
+            cancelled.append(dependant)
+            stack.extend(self._dependants[dependant])
+        return cancelled
+
+    def skip(self, step_id: str, reason: str) -> List[str]:
+        """
+        Skips a step that has not started. Dependants that use its results
+        are skipped too; the others are released as if it had completed.
+
+        Returns:
+            Every step skipped, starting with `step_id` (empty if it had
+            already started)
+        """
+        if self.is_terminal(step_id) or self.states[step_id] == StepState.RUNNING:
+            return []
+        skipped = []
+        stack = [(step_id, reason)]
+        while stack:
+            current, current_reason = stack.pop()
+            if self.is_terminal(current) or self.states[current] == StepState.RUNNING:
+                continue
+            self.states[current] = StepState.SKIPPED
+            self.reasons[current] = current_reason
+            skipped.append(current)
+            for dependant in self._dependants[current]:
+                if self.plan.step_map[dependant].use_previous_results:
+                    stack.append((dependant, f"Dependency '{current}' was skipped"))
+            self._release_dependants(current)
+        return skipped
+
+    def cancel_unreachable(self) -> List[str]:
+        """
+        Cancels steps that can never start (dependency cycles). Only
+        meaningful once nothing is ready or running.
+        """
+        cancelled = []
+        for step_id, state in self.states.items():
+            if state == StepState.PENDING:
+                self.states[step_id] = StepState.CANCELLED
+                self.reasons[step_id] = "Unsatisfiable (circular) dependencies"
+                cancelled.append(step_id)
+        return cancelled
+
+    @property
+    def is_done(self) -> bool:
+        return all(state in TERMINAL_STATES for state in self.states.values())
+
+    def apply_skips(self):
+        """Records skip reasons on the plan's steps so they serialize"""
+        for step_id, state in self.states.items():
+            if state == StepState.SKIPPED:
+                self.plan.step_map[step_id].skip_reason = self.reasons[step_id]
+
+    def snapshot(self) -> Dict[str, str]:
+        """Current state of every step, by step id"""
+        return {step_id: state.value for step_id, state in self.states.items()}
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from LLM.response_cache import canonical_hash
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class RecordingNotFound(httpx.TransportError):
+    """Raised in replay mode when no recording matches a request"""
+
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that records request/response pairs to disk, or serves
+    them back without touching the network.
+
+    Recordings are JSON files named by the canonical hash of the request
+    (method, URL, query and JSON body; headers are ignored so credentials
+    never affect or leak into the key). A `normalize` hook can strip
+    volatile parts of the body, such as timestamps, before hashing.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        directory: str,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+        normalize: Optional[Callable[[Any], Any]] = None,
+        replay_latency: float = 0.0,
+    ):
+        """
+        Args:
+            mode: "record" (call through and persist) or "replay" (disk only)
+            directory: Where recordings are stored
+            inner: Transport used for live calls in record mode
+            normalize: Maps a parsed JSON body to the value used for the key
+            replay_latency: Multiplier applied to the recorded latency when
+                replaying (0 serves recordings immediately)
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown transport mode: {mode}")
+        self.mode = mode
+        self.directory = directory
+        self.inner = inner or (httpx.AsyncHTTPTransport() if mode == RECORD else None)
+        self.normalize = normalize
+        self.replay_latency = replay_latency
+        os.makedirs(directory, exist_ok=True)
+
+    def request_key(self, request: httpx.Request) -> str:
+        body: Any = None
+        if request.content:
+            try:
+                body = json.loads(request.content)
+            except ValueError:
+                body = request.content.decode("utf-8", errors="replace")
+        if self.normalize is not None and body is not None:
+            body = self.normalize(body)
+        return canonical_hash(
+            {
+                "method": request.method,
+                "host": request.url.host,
+                "path": request.url.path,
+                "query": sorted(request.url.params.multi_items()),
+                "body": body,
+            }
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = self.request_key(request)
+        if self.mode == REPLAY:
+            return await self._replay(request, key)
+        return await self._record(request, key)
+
+    async def _record(self, request: httpx.Request, key: str) -> httpx.Response:
+        start_time = time.time()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        latency = time.time() - start_time
+
+        recording = {
+            "request": {
+                "method": request.method,
+                "url": str(request.url),
+                "body": request.content.decode("utf-8", errors="replace"),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "content_type": response.headers.get("content-type"),
+                "body": content.decode("utf-8", errors="replace"),
+            },
+            "latency": latency,
+            "recorded_at": time.time(),
+        }
+        await asyncio.to_thread(self._write, key, recording)
+        print(f"📼 Recorded {request.method} {request.url.path} -> {key[:12]}")
+
+        return self._build_response(request, recording["response"])
+
+    def _write(self, key: str, recording: Dict[str, Any]):
+        temp_path = f"{self._path(key)}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(recording, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self._path(key))
+
+    async def _replay(self, request: httpx.Request, key: str) -> httpx.Response:
+        path = self._path(key)
+        if not os.path.exists(path):
+            raise RecordingNotFound(
+                f"No recording for {request.method} {request.url.path} ({key[:12]})",
+                request=request,
+            )
+        with open(path, "r", encoding="utf-8") as f:
+            recording = json.load(f)
+        if self.replay_latency > 0:
+            await asyncio.sleep(recording.get("latency", 0.0) * self.replay_latency)
+        return self._build_response(request, recording["response"])
+
+    @staticmethod
+    def _build_response(request: httpx.Request, recorded: Dict[str, Any]):
+        headers = {}
+        if recorded.get("content_type"):
+            headers["content-type"] = recorded["content_type"]
+        return httpx.Response(
+            status_code=recorded["status_code"],
+            headers=headers,
+            content=recorded["body"].encode("utf-8"),
+            request=request,
+        )
+
+    async def aclose(self):
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+def transport_factory_from_env(
+    prefix: str,
+    normalize: Optional[Callable[[Any], Any]] = None,
+) -> Optional[Callable[[], httpx.AsyncBaseTransport]]:
+    """
+    Builds a transport factory from `<prefix>_TRANSPORT_MODE`,
+    `<prefix>_RECORDINGS_DIR` and `<prefix>_REPLAY_LATENCY`, or returns None
+    when recording/replay is not enabled.
+    """
+    mode = os.getenv(f"{prefix}_TRANSPORT_MODE", "").lower()
+    if mode not in (RECORD, REPLAY):
+        return None
+    directory = os.getenv(f"{prefix}_RECORDINGS_DIR", f"recordings/{prefix.lower()}")
+    replay_latency = float(os.getenv(f"{prefix}_REPLAY_LATENCY", "0"))
+    print(f"📼 {prefix} transport in {mode} mode ({directory})")
+
+    def factory() -> httpx.AsyncBaseTransport:
+        return RecordReplayTransport(
+            mode,
+            directory,
+            normalize=normalize,
+            replay_latency=replay_latency,
+        )
+
+    return factory
@@ -0,0 +1,181 @@
+import re
+from typing import Dict, List, Optional
+
+# Execution order used for `suggested_tools`
+TOOL_ORDER = [
+    "search_companies",
+    "search_leads",
+    "generate_email",
+    "create_cadence",
+    "add_contacts_to_cadence",
+]
+SEARCH_TOOLS = {"search_companies", "search_leads"}
+
+
+def _pattern(*phrases: str) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(phrases) + r")\b")
+
+
+def _near(first: str, second: str, words: int) -> re.Pattern:
+    """Matches `first` followed by `second` at most `words` words later"""
+    return re.compile(
+        r"\b(?:" + first + r")\b\W+(?:[\w'-]+\W+){0," + str(words) + r"}?(?:"
+        + second
+        + r")\b"
+    )
+
+
+# Same rule table as the check_missing_tools prompt, as keyword patterns
+CAMPAIGN_WORDS = r"campaigns?|cadences?|sequences?|outreach"
+CAMPAIGN = _pattern(CAMPAIGN_WORDS)
+WEAK_CAMPAIGN = _pattern(r"launch\w*", r"automat\w*", r"start", r"set up", r"drip")
+EMAIL_WRITING = _pattern(
+    r"write",
+    r"draft\w*",
+    r"compose",
+    r"(?:an|cold|intro|outreach|follow[- ]up|professional|personali[sz]ed) emails?",
+    r"emails? (?:template|content|copy|body)",
+    r"(?:generate|create) (?:an |the |a )?emails?",
+    r"email (?:them|these|those|each|all)",
+)
+EMAIL_MENTION = _pattern(r"e-?mails?", r"mails?", r"templates?")
+# "Don't create a campaign yet", "no emails", "without a cadence"
+NEGATION_WORDS = r"don'?t|do not|doesn'?t|not|no|without|never|yet"
+EMAIL_WORDS = r"e-?mails?|mails?"
+NEGATED = [
+    _near(NEGATION_WORDS, CAMPAIGN_WORDS + "|" + EMAIL_WORDS, 4),
+    _near(CAMPAIGN_WORDS + "|" + EMAIL_WORDS, r"yet|later", 2),
+]
+# A campaign counts as requested only as the object of an action
+CAMPAIGN_ACTION = _near(
+    r"creat\w*|launch\w*|start\w*|set up|setup|build|run|add\w*|put|enroll\w*"
+    r"|include|use|begin|kick off|send",
+    CAMPAIGN_WORDS,
+    5,
+)
+# "the Zoho cadence", "my Q3 campaign", "an existing sequence"
+NAMED_CAMPAIGN = re.compile(
+    r"\bexisting\b|\b(?:the|my|our|this|that)\s+(?:[\w-]+\s+){0,3}?(?:"
+    + CAMPAIGN_WORDS
+    + r")\b"
+)
+SEARCH = _pattern(
+    r"find\w*",
+    r"search\w*",
+    r"look(?:ing)? for",
+    r"get",
+    r"list",
+    r"show",
+    r"research",
+    r"identify",
+    r"who are",
+)
+ADD_TO_EXISTING = _pattern(
+    r"add\w*", r"include", r"put (?:them |these |those )?in", r"existing"
+)
+CREATE = _pattern(r"creat\w*", r"new", r"set up", r"launch\w*", r"start\w*", r"build")
+EXISTING_CONTACTS = _pattern(
+    r"(?:these|those|the found|found|above) (?:contacts|people|leads|prospects|results)",
+    r"search results",
+    r"them",
+)
+
+
+def intent_flags(user_message: str) -> tuple:
+    """
+    The keyword signals the missing-tools decision turns on (campaign asked
+    for, created or existing, negated, email, search, add). Requests that
+    differ in any of these need different answers however alike they read.
+    """
+    text = " ".join(user_message.lower().split())
+    return (
+        bool(CAMPAIGN.search(text)),
+        bool(CAMPAIGN_ACTION.search(text)),
+        bool(CREATE.search(text)),
+        bool(NAMED_CAMPAIGN.search(text)),
+        any(pattern.search(text) for pattern in NEGATED),
+        bool(EMAIL_WRITING.search(text)),
+        bool(EMAIL_MENTION.search(text)),
+        bool(SEARCH.search(text)),
+        bool(ADD_TO_EXISTING.search(text)),
+    )
+
+
+def classify_missing_tools(
+    user_message: str, current_tools: List[str], context_info: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    Decides locally whether the planner missed a tool.
+
+    Returns:
+        A result shaped like the LLM's `check_missing_tools` answer, or None
+        when the request is ambiguous and should be escalated to the LLM
+    """
+    text = " ".join(user_message.lower().split())
+    summary_data = (context_info or {}).get("summary_data", {})
+    called = set(current_tools)
+    if not called <= set(TOOL_ORDER):
+        return None
+    has_contacts = bool(summary_data.get("contact_ids")) or "search_leads" in called
+    has_email = bool(summary_data.get("email_content")) or "generate_email" in called
+
+    if any(pattern.search(text) for pattern in NEGATED):
+        return None  # "don't create a campaign yet" must not add one
+    mentions_campaign = bool(CAMPAIGN.search(text))
+    wants_campaign = bool(CAMPAIGN_ACTION.search(text))
+    if mentions_campaign and not wants_campaign:
+        return None  # "companies whose outreach team is hiring" is a criterion
+    wants_email = bool(EMAIL_WRITING.search(text))
+    wants_search = bool(SEARCH.search(text))
+    adds_to_existing = bool(ADD_TO_EXISTING.search(text))
+
+    if not wants_campaign and WEAK_CAMPAIGN.search(text):
+        return None  # "launch"/"start" alone may or may not mean a campaign
+    if not wants_email and EMAIL_MENTION.search(text) and not has_email:
+        return None  # "emails of CTOs" vs "an email to CTOs"
+    if wants_search and not called & SEARCH_TOOLS:
+        if not EXISTING_CONTACTS.search(text):
+            return None  # a search was asked for but not planned
+    if not (wants_campaign or wants_email or wants_search or adds_to_existing):
+        return None
+
+    missing: List[str] = []
+    if wants_email and not has_email:
+        missing.append("generate_email")
+
+    if wants_campaign:
+        creates = (
+            "create_cadence" in called
+            or not adds_to_existing
+            or bool(CREATE.search(text))
+        )
+        if not creates:
+            if not NAMED_CAMPAIGN.search(text):
+                return None  # "put them in a cadence" may need a new one
+            # "Add these leads to the Zoho cadence": the cadence already exists
+            if "add_contacts_to_cadence" not in called:
+                missing.append("add_contacts_to_cadence")
+        else:
+            if "create_cadence" not in called:
+                missing.append("create_cadence")
+            if not has_email and "generate_email" not in missing:
+                missing.append("generate_email")
+            if has_contacts and "add_contacts_to_cadence" not in called:
+                # Recipients may go to create_cadence directly or through
+                # add_contacts_to_cadence; the prompt's examples disagree
+                return None
+    elif adds_to_existing:
+        return None  # "add"/"include" without saying where to
+
+    missing.sort(key=TOOL_ORDER.index)
+    suggested = sorted(called | set(missing), key=TOOL_ORDER.index)
+    return {
+        "has_missing_tools": bool(missing),
+        "reasoning": (
+            f"Local rules: request needs {', '.join(missing)}"
+            if missing
+            else "Local rules: planned tools cover the request"
+        ),
+        "missing_tools": missing,
+        "suggested_tools": suggested,
+    }
@@ -1,6 +1,28 @@
+import asyncio
+import json
+import threading
 import pymongo
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from LLM.response_cache import canonical_hash
+
+# Marker for a value stored once in the prompt blob collection
+BLOB_REF_KEY = "__blob__"
+
+
+def _snapshot(value: Any) -> Any:
+    """
+    Copies the dict/list structure of a log document, sharing the leaf
+    values. Cheaper than deepcopy, and enough to keep later mutations by
+    the caller out of a buffered document.
+    """
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot(item) for item in value]
+    return value
 
 
 class MongoClient:
@@ -15,6 +37,12 @@ class MongoClient:
         conversations_collection: str = "conversations",
         open_router_logs_collection: str = "open_router_logs",
         clodura_api_collection: str = "clodura_api_collection",
+        prompt_blobs_collection: str = "prompt_blobs",
+        prompt_blob_min_bytes: int = 1024,
+        log_batch_size: int = 100,
+        log_flush_interval: float = 1.0,
+        log_queue_size: int = 10000,
+        log_drop_policy: str = "drop_oldest",
     ):
         """
         Initializes the MongoDB connection.
@@ -23,6 +51,13 @@ class MongoClient:
             connection_string: Your MongoDB connection string.
             db_name: The name of the database to use.
             collection_name: The name of the collection to store logs in.
+            prompt_blobs_collection: Collection holding content-addressed
+                prompt/tool blobs referenced by LLM request logs.
+            prompt_blob_min_bytes: Messages at least this large are stored as blobs.
+            log_batch_size: Maximum log documents written per insert_many.
+            log_flush_interval: Seconds between background log flushes.
+            log_queue_size: Maximum buffered log documents.
+            log_drop_policy: "drop_oldest" or "drop_newest" when the buffer is full.
         """
         self.client = pymongo.MongoClient(connection_string)
         self.db = self.client[db_name]
@@ -30,27 +65,54 @@ class MongoClient:
             conversations_collection,
             open_router_logs_collection,
             clodura_api_collection,
+            prompt_blobs_collection,
         )
         self.conversations_collection = self.db[conversations_collection]
         self.open_router_logs_collection = self.db[open_router_logs_collection]
         self.clodura_api_collection = self.db[clodura_api_collection]
+        self.prompt_blobs_collection = self.db[prompt_blobs_collection]
+        self.prompt_blob_min_bytes = prompt_blob_min_bytes
+        # Blobs confirmed written, and blobs buffered but not yet written
+        self._known_blobs: set = set()
+        self._pending_blobs: set = set()
+
+        # Request logs are buffered and written in batches by a background
+        # task (see start_log_writer) so logging never blocks the event loop
+        self.log_batch_size = log_batch_size
+        self.log_flush_interval = log_flush_interval
+        self.log_queue_size = log_queue_size
+        self.log_drop_policy = log_drop_policy
+        self._log_buffer: deque = deque()
+        # Blobs are referenced by logs, so they are never dropped when full
+        self._blob_buffer: deque = deque()
+        self._log_lock = threading.Lock()
+        self._log_task: Optional[asyncio.Task] = None
+        self._log_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._log_wakeup: Optional[asyncio.Event] = None
+        self._log_stopping = False
+        self.logs_written = 0
+        self.logs_dropped = 0
+        self.logs_failed = 0
 
     def _create_collections_if_not_exist(
         self,
         conversations_collection: str,
         open_router_logs_collection: str,
         clodura_api_collection: str,
+        prompt_blobs_collection: str,
     ):
         """
         Creates collections if they don't already exist
         Args:
             conversations_collection: Name of the conversations collection
             open_router_logs_collection: Name of the open router logs collection
+            prompt_blobs_collection: Name of the prompt blob collection
         """
         collections_to_create = [
             conversations_collection,
             open_router_logs_collection,
             clodura_api_collection,
+            prompt_blobs_collection,
         ]
 
         for collection_name in collections_to_create:
@@ -71,11 +133,286 @@ class MongoClient:
             log_data: A dictionary containing the data to be logged.
         """
         log_data["timestamp"] = datetime.now(timezone.utc)
-        self.open_router_logs_collection.insert_one(log_data)
+        # Payload compaction (serializing and hashing every message) is done
+        # by the writer, not on the request path
+        self._enqueue_log(self.open_router_logs_collection, log_data, compact=True)
+
+    def _prepare_log(self, log_data: Dict[str, Any], compact: bool) -> Dict[str, Any]:
+        """Turns a buffered log snapshot into the document to insert"""
+        if compact and "request_payload" in log_data:
+            log_data["request_payload"] = self._compact_payload(
+                log_data["request_payload"]
+            )
+        return log_data
+
+    def _compact_payload(self, payload: Any) -> Any:
+        """
+        Replaces large, repeated parts of an LLM request (system prompt, long
+        history messages, tool schemas) with references to content-addressed
+        blobs, so each is stored once.
+        """
+        if not isinstance(payload, dict):
+            return payload
+        compacted = dict(payload)
+        messages = payload.get("messages")
+        if isinstance(messages, list):
+            compacted["messages"] = [
+                self._blob_ref(message)
+                if len(json.dumps(message, default=str)) >= self.prompt_blob_min_bytes
+                else message
+                for message in messages
+            ]
+        if payload.get("tools"):
+            compacted["tools"] = self._blob_ref(payload["tools"])
+        return compacted
+
+    def _blob_ref(self, value: Any) -> Dict[str, str]:
+        """Stores a value under its content hash (once) and returns a reference"""
+        blob_hash = canonical_hash(value)
+        with self._log_lock:
+            if blob_hash in self._known_blobs or blob_hash in self._pending_blobs:
+                return {BLOB_REF_KEY: blob_hash}
+            self._pending_blobs.add(blob_hash)
+
+        # `value` comes from a snapshot taken at enqueue time
+        blob = {
+            "_id": blob_hash,
+            "value": value,
+            "created_at": datetime.now(timezone.utc),
+        }
+        if self._log_task is None:
+            try:
+                self.prompt_blobs_collection.insert_one(blob)
+            except DuplicateKeyError:
+                pass  # stored by an earlier process
+            except Exception:
+                self._settle_blobs([blob_hash], written=False)
+                raise
+            self._settle_blobs([blob_hash], written=True)
+        else:
+            with self._log_lock:
+                self._blob_buffer.append(blob)
+        return {BLOB_REF_KEY: blob_hash}
+
+    def _settle_blobs(self, blob_hashes: List[str], written: bool):
+        """
+        Moves blobs out of the pending set once their write has finished.
+        Failed blobs are forgotten so the next reference stores them again.
+        """
+        with self._log_lock:
+            self._pending_blobs.difference_update(blob_hashes)
+            if written:
+                if len(self._known_blobs) >= 10000:
+                    self._known_blobs.clear()
+                self._known_blobs.update(blob_hashes)
+
+    def expand_blobs(self, value: Any, _cache: Optional[Dict] = None) -> Any:
+        """Recursively replaces blob references with the stored values"""
+        cache = {} if _cache is None else _cache
+        if isinstance(value, dict):
+            if set(value.keys()) == {BLOB_REF_KEY}:
+                blob_hash = value[BLOB_REF_KEY]
+                if blob_hash not in cache:
+                    blob = self.prompt_blobs_collection.find_one({"_id": blob_hash})
+                    cache[blob_hash] = blob["value"] if blob else value
+                return self.expand_blobs(cache[blob_hash], cache)
+            return {k: self.expand_blobs(v, cache) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.expand_blobs(item, cache) for item in value]
+        return value
+
+    def reconstruct_llm_request(self, request_id: str) -> Optional[Dict]:
+        """
+        Loads an llm_requests log entry with every blob reference expanded
+        back into the full request payload. Intended for debugging.
+        """
+        try:
+            doc = self.open_router_logs_collection.find_one({"request_id": request_id})
+            return self.expand_blobs(doc) if doc else None
+        except Exception as e:
+            print(f"❌ Error reconstructing LLM request {request_id}: {e}")
+            return None
 
     def log_clodura_api_request(self, log_data: Dict[str, Any]):
         log_data["timestamp"] = datetime.now(timezone.utc)
-        self.clodura_api_collection.insert_one(log_data)
+        self._enqueue_log(self.clodura_api_collection, log_data)
+
+    def _enqueue_log(
+        self, collection, log_data: Dict[str, Any], compact: bool = False
+    ):
+        """
+        Buffers a log document for the background writer. Falls back to a
+        direct insert when the writer is not running (e.g. scripts).
+
+        The document is snapshotted first, so callers may keep mutating their
+        dict and never see the `_id` the driver adds on insert. With
+        `compact`, the writer replaces large payload parts with blob
+        references before inserting.
+        """
+        log_data = _snapshot(log_data)
+        if self._log_task is None:
+            try:
+                collection.insert_one(self._prepare_log(log_data, compact))
+                self.logs_written += 1
+            except DuplicateKeyError:
+                pass  # blob already stored
+            return
+
+        with self._log_lock:
+            if len(self._log_buffer) >= self.log_queue_size:
+                self.logs_dropped += 1
+                if self.logs_dropped % 1000 == 1:
+                    print(
+                        f"⚠️ Log buffer full, {self.logs_dropped} log(s) dropped "
+                        f"({self.log_drop_policy})"
+                    )
+                if self.log_drop_policy == "drop_newest":
+                    return
+                self._log_buffer.popleft()
+            self._log_buffer.append((collection, log_data, compact))
+            should_wake = len(self._log_buffer) >= self.log_batch_size
+
+        if should_wake:
+            # May be called from another thread/event loop (title generation)
+            self._log_loop.call_soon_threadsafe(self._log_wakeup.set)
+
+    async def start_log_writer(self):
+        """Starts the background task that batches log writes"""
+        if self._log_task is not None:
+            return
+        self._log_loop = asyncio.get_running_loop()
+        self._log_wakeup = asyncio.Event()
+        self._log_stopping = False
+        self._log_task = asyncio.create_task(self._log_writer_loop())
+        print("📝 Started batched Mongo log writer")
+
+    async def stop_log_writer(self):
+        """
+        Stops the background writer once it has drained the buffer. The
+        writer is never cancelled mid-flush, so no batch is lost.
+        """
+        if self._log_task is None:
+            return
+        self._log_stopping = True
+        self._log_wakeup.set()
+        try:
+            await self._log_task
+        except Exception as e:
+            print(f"❌ Log writer failed while stopping: {e}")
+        self._log_task = None
+        # Anything enqueued while the writer was finishing its last flush
+        await self.flush_logs()
+        print(
+            f"📝 Log writer stopped ({self.logs_written} written, "
+            f"{self.logs_dropped} dropped, {self.logs_failed} failed)"
+        )
+
+    async def _log_writer_loop(self):
+        while not self._log_stopping:
+            try:
+                await asyncio.wait_for(
+                    self._log_wakeup.wait(), timeout=self.log_flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._log_wakeup.clear()
+            await self.flush_logs()
+
+    def _prepare_batch(self, batch: List[tuple]) -> Dict[str, tuple]:
+        """Compacts a batch of buffered logs and groups it by collection"""
+        by_collection: Dict[str, tuple] = {}
+        for collection, log_data, compact in batch:
+            try:
+                document = self._prepare_log(log_data, compact)
+            except Exception as e:
+                self.logs_failed += 1
+                print(f"❌ Error preparing log for mongo db: {e}")
+                continue
+            by_collection.setdefault(collection.name, (collection, []))[1].append(
+                document
+            )
+        return by_collection
+
+    async def flush_logs(self):
+        """Writes all buffered log documents with insert_many"""
+        await self._flush_blobs()
+        while True:
+            with self._log_lock:
+                batch = [
+                    self._log_buffer.popleft()
+                    for _ in range(min(self.log_batch_size, len(self._log_buffer)))
+                ]
+            if not batch:
+                return
+
+            by_collection = await asyncio.to_thread(self._prepare_batch, batch)
+            # Blobs go first so logs never reference a blob that isn't stored yet
+            await self._flush_blobs()
+
+            for collection, documents in by_collection.values():
+                try:
+                    await asyncio.to_thread(
+                        collection.insert_many, documents, ordered=False
+                    )
+                    self.logs_written += len(documents)
+                except BulkWriteError as e:
+                    details = e.details or {}
+                    self.logs_written += details.get("nInserted", 0)
+                    # Duplicate keys are blobs stored by an earlier process
+                    real_errors = [
+                        error
+                        for error in details.get("writeErrors", [])
+                        if error.get("code") != 11000
+                    ]
+                    if real_errors:
+                        self.logs_failed += len(real_errors)
+                        print(f"❌ Error writing {len(real_errors)} log(s) to mongo db")
+                except Exception as e:
+                    self.logs_failed += len(documents)
+                    print(f"❌ Error writing {len(documents)} log(s) to mongo db: {e}")
+
+    async def _flush_blobs(self):
+        """Writes buffered blobs, marking them known only once stored"""
+        while True:
+            with self._log_lock:
+                blobs = [
+                    self._blob_buffer.popleft()
+                    for _ in range(min(self.log_batch_size, len(self._blob_buffer)))
+                ]
+            if not blobs:
+                return
+
+            failed = set()
+            try:
+                await asyncio.to_thread(
+                    self.prompt_blobs_collection.insert_many, blobs, ordered=False
+                )
+            except BulkWriteError as e:
+                # Duplicate keys are blobs stored by an earlier process
+                failed = {
+                    error.get("index")
+                    for error in (e.details or {}).get("writeErrors", [])
+                    if error.get("code") != 11000
+                }
+            except Exception as e:
+                failed = set(range(len(blobs)))
+                print(f"❌ Error writing {len(blobs)} blob(s) to mongo db: {e}")
+            if failed:
+                self.logs_failed += len(failed)
+            self._settle_blobs(
+                [blob["_id"] for i, blob in enumerate(blobs) if i not in failed],
+                written=True,
+            )
+            self._settle_blobs([blobs[i]["_id"] for i in failed], written=False)
+
+    def get_log_stats(self) -> Dict[str, int]:
+        """Returns counters for the batched log writer"""
+        return {
+            "buffered": len(self._log_buffer) + len(self._blob_buffer),
+            "written": self.logs_written,
+            "dropped": self.logs_dropped,
+            "failed": self.logs_failed,
+        }
 
     def save_conversation(
         self,
@@ -0,0 +1,176 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from LLM.response_cache import canonical_hash
+from execution_type_analyser import ExecutionPlan, ExecutionStep
+from tool_contracts import READ_ONLY_TOOLS
+
+RunStep = Callable[[ExecutionStep, Dict[str, Dict], str], Awaitable[Dict]]
+
+
+class PlanSpeculator:
+    """
+    Runs the read-only steps of a plan while it waits for review.
+
+    Each speculated step is keyed by a fingerprint of its tool, arguments and
+    the fingerprints of the steps it depends on, so a result is only reused
+    when the approved plan would have run exactly the same call. Steps that
+    write (cadence creation, adding contacts) and anything downstream of
+    them are never speculated.
+    """
+
+    def __init__(
+        self,
+        run_step: RunStep,
+        read_only_tools: frozenset = READ_ONLY_TOOLS,
+        ttl: float = 600.0,
+    ):
+        """
+        Args:
+            run_step: Coroutine that executes one step given the results of
+                its dependencies and the session id
+            read_only_tools: Tools that may run before approval
+            ttl: Seconds after which an unclaimed speculation is dropped
+        """
+        self.run_step = run_step
+        self.read_only_tools = read_only_tools
+        self.ttl = ttl
+        # plan_id -> (started_at, {fingerprint: task})
+        self._speculations: Dict[str, tuple] = {}
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    @staticmethod
+    def fingerprints(plan: ExecutionPlan) -> Dict[str, str]:
+        """Fingerprint of every step, covering its whole upstream chain"""
+        fingerprints: Dict[str, str] = {}
+
+        def visit(step: ExecutionStep, path: tuple) -> str:
+            if step.step_id in fingerprints:
+                return fingerprints[step.step_id]
+            upstream = [
+                visit(plan.step_map[dep], path + (step.step_id,))
+                for dep in step.depends_on
+                if dep in plan.step_map and dep not in path
+            ]
+            fingerprints[step.step_id] = canonical_hash(
+                {
+                    "tool": step.tool_name,
+                    "args": step.tool_args,
+                    "use_previous_results": step.use_previous_results,
+                    "upstream": upstream,
+                }
+            )
+            return fingerprints[step.step_id]
+
+        for step in plan.steps:
+            visit(step, ())
+        return fingerprints
+
+    def _speculable(self, plan: ExecutionPlan) -> Dict[str, ExecutionStep]:
+        """Read-only steps whose whole upstream chain is read-only"""
+        speculable: Dict[str, bool] = {}
+
+        def check(step: ExecutionStep, path: tuple) -> bool:
+            if step.step_id not in speculable:
+                speculable[step.step_id] = (
+                    step.tool_name in self.read_only_tools
+                    and not getattr(step, "skip_reason", None)
+                    and all(
+                        dep in plan.step_map
+                        and dep not in path
+                        and check(plan.step_map[dep], path + (step.step_id,))
+                        for dep in step.depends_on
+                    )
+                )
+            return speculable[step.step_id]
+
+        return {step.step_id: step for step in plan.steps if check(step, ())}
+
+    def start(self, plan_id: str, plan: ExecutionPlan, session_id: str) -> int:
+        """
+        Starts speculating the plan's read-only steps in the background.
+
+        Returns:
+            The number of steps started
+        """
+        self._prune()
+        if plan_id in self._speculations:
+            return 0
+
+        steps = self._speculable(plan)
+        fingerprints = self.fingerprints(plan)
+        tasks: Dict[str, asyncio.Task] = {}
+        by_step: Dict[str, asyncio.Task] = {}
+
+        async def speculate(step: ExecutionStep) -> Dict:
+            # Dependencies are speculated too; their failure fails this step
+            dep_results = {}
+            for dep in step.depends_on:
+                dep_results[dep] = await asyncio.shield(by_step[dep])
+            return await self.run_step(step, dep_results, session_id)
+
+        def schedule(step: ExecutionStep) -> asyncio.Task:
+            if step.step_id not in by_step:
+                for dep in step.depends_on:
+                    schedule(steps[dep])
+                task = asyncio.ensure_future(speculate(step))
+                # Unclaimed failures are expected; don't log them as unretrieved
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                by_step[step.step_id] = task
+                tasks[fingerprints[step.step_id]] = task
+            return by_step[step.step_id]
+
+        for step in steps.values():
+            schedule(step)
+
+        if tasks:
+            self._speculations[plan_id] = (time.monotonic(), tasks)
+            self.started += len(tasks)
+            print(
+                f"🔮 Speculating {len(tasks)} read-only step(s) for {plan_id}: "
+                f"{list(steps)}"
+            )
+        return len(tasks)
+
+    def take(
+        self, plan_id: Optional[str], step: ExecutionStep, fingerprint: str
+    ) -> Optional[asyncio.Task]:
+        """Claims the speculated task for an approved step, if one matches"""
+        entry = self._speculations.get(plan_id)
+        if entry is None or step.tool_name not in self.read_only_tools:
+            return None
+        task = entry[1].pop(fingerprint, None)
+        if task is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return task
+
+    def discard(self, plan_id: Optional[str]):
+        """Cancels and forgets every unclaimed speculation of a plan"""
+        entry = self._speculations.pop(plan_id, None)
+        if entry is None:
+            return
+        for task in entry[1].values():
+            if not task.done():
+                task.cancel()
+            self.discarded += 1
+
+    def _prune(self):
+        now = time.monotonic()
+        for plan_id, (started_at, _) in list(self._speculations.items()):
+            if now - started_at > self.ttl:
+                self.discard(plan_id)
+
+    def get_stats(self) -> Dict:
+        return {
+            "pending_plans": len(self._speculations),
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+        }
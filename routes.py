@@ -18,6 +18,7 @@ from datetime import datetime, date, time
 from clodura_client import CloduraClient
 from mongo_client import MongoClient
 from agent import LangGraphSalesAgent
+from LLM.retry_policy import reset_request_deadline, set_request_deadline
 
 load_dotenv()
 
@@ -58,6 +59,8 @@ async def lifespan(app: FastAPI):
             clodura_base_url=os.getenv("CLODURA_BASE_URL"),
             mongo_connection_url=os.getenv("MONGO_CONNECTION_URL"),
         )
+        await agent.openrouter_client.open()
+        await agent.mongo_client.start_log_writer()
         print("✅ LangGraph Sales Agent initialized successfully")
     except Exception as e:
         print(f"❌ Failed to initialize LangGraph Sales Agent: {e}")
@@ -66,6 +69,8 @@ async def lifespan(app: FastAPI):
     yield
 
     print("🔄 Shutting down...")
+    await agent.openrouter_client.close()
+    await agent.mongo_client.stop_log_writer()
 
 
 # Create FastAPI app with lifespan
@@ -86,6 +91,8 @@ async def timeout_middleware(request: Request, call_next):
     else:
         timeout = 60  # 1 minute for other endpoints
 
+    # LLM retries read this deadline so they never outlive the request
+    deadline_token = set_request_deadline(timeout)
     try:
         return await asyncio.wait_for(call_next(request), timeout=timeout)
     except asyncio.TimeoutError:
@@ -96,6 +103,8 @@ async def timeout_middleware(request: Request, call_next):
                 "message": f"Request took longer than {timeout} seconds",
             },
         )
+    finally:
+        reset_request_deadline(deadline_token)
 
 
 # Add CORS middleware
@@ -378,6 +387,33 @@ async def chat_endpoint(request: ChatRequest):
                         ),
                     }
 
+                elif event_type == "plan_auto_approved":
+                    # Read-only plan: shown for reference, already executing
+                    yield {
+                        "event": "plan_auto_approved",
+                        "data": json.dumps(
+                            {
+                                "plan": chunk.get("plan", {}),
+                                "plan_id": chunk.get("plan_id"),
+                                "message": chunk.get("message", ""),
+                                "session_id": session_id,
+                            }
+                        ),
+                    }
+
+                elif event_type == "token":
+                    # Incremental LLM output for text responses
+                    yield {
+                        "event": "token",
+                        "data": json.dumps(
+                            {
+                                "node": chunk.get("node"),
+                                "content": chunk.get("content", ""),
+                                "session_id": session_id,
+                            }
+                        ),
+                    }
+
                 elif event_type == "progress":
                     # Progress event
                     progress = chunk.get("progress", {})
@@ -940,6 +976,33 @@ async def proxy_tag_sequences(request: Request):
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 
+@app.get("/stats/llm")
+async def llm_stats():
+    """
+    LLM client statistics, including p50/p95/p99 latency and token
+    histograms per purpose and model
+    """
+    global agent
+
+    if agent is None:
+        raise HTTPException(status_code=500, detail="LangGraph agent not initialized")
+
+    return agent.openrouter_client.get_stats()
+
+
+@app.get("/stats/speculation")
+async def speculation_stats():
+    """Hits/misses of read-only steps run speculatively during plan review"""
+    global agent
+
+    if agent is None:
+        raise HTTPException(status_code=500, detail="LangGraph agent not initialized")
+    if agent.plan_speculator is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **agent.plan_speculator.get_stats()}
+
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
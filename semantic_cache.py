@@ -0,0 +1,153 @@
+import copy
+import re
+import threading
+import zlib
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # faiss is optional; fall back to a numpy dot product
+    faiss = None
+
+
+class HashedNgramEmbedder:
+    """
+    Embeds text locally as a hashed bag of word unigrams and character
+    n-grams. Word order does not matter, so "find CEOs in Pune fintech" and
+    "fintech CEOs in Pune" land close together without an embedding service.
+    """
+
+    # Filler words that carry no planning signal
+    STOPWORDS = frozenset(
+        "a an the in at of for to me my us please find search get show list "
+        "some all can you i".split()
+    )
+
+    def __init__(self, dim: int = 512, ngram_sizes: tuple = (3, 4)):
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+
+    def _features(self, text: str) -> List[str]:
+        tokens = [
+            token
+            for token in re.findall(r"[a-z0-9&]+", text.lower())
+            if token not in self.STOPWORDS
+        ]
+        features = []
+        for token in tokens:
+            features.append(f"w:{token}")
+            padded = f"#{token}#"
+            for n in self.ngram_sizes:
+                for i in range(max(len(padded) - n + 1, 1)):
+                    features.append(f"c:{padded[i:i + n]}")
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        """Returns an L2-normalized float32 vector"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = zlib.crc32(feature.encode("utf-8"))
+            # Signed hashing keeps collisions from only ever adding similarity
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dim] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class _ScopeIndex:
+    """Vectors and cached values for one scope"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.vectors: List[np.ndarray] = []
+        self.values: List[Dict] = []
+        self.index = faiss.IndexFlatIP(dim) if faiss is not None else None
+
+    def add(self, vector: np.ndarray, value: Dict):
+        self.vectors.append(vector)
+        self.values.append(value)
+        if self.index is not None:
+            self.index.add(vector.reshape(1, -1))
+
+    def search(self, vector: np.ndarray) -> tuple:
+        """Returns (similarity, position) of the nearest entry"""
+        if not self.vectors:
+            return -1.0, -1
+        if self.index is not None:
+            scores, positions = self.index.search(vector.reshape(1, -1), 1)
+            return float(scores[0][0]), int(positions[0][0])
+        scores = np.stack(self.vectors) @ vector
+        position = int(np.argmax(scores))
+        return float(scores[position]), position
+
+    def trim(self, max_entries: int):
+        """Drops the oldest entries once the scope is over capacity"""
+        if len(self.vectors) <= max_entries:
+            return
+        self.vectors = self.vectors[-max_entries:]
+        self.values = self.values[-max_entries:]
+        if self.index is not None:
+            self.index.reset()
+            self.index.add(np.stack(self.vectors))
+
+
+class SemanticCache:
+    """
+    Similarity cache for planner decisions.
+
+    Entries are partitioned by an exact scope (purpose, tools called, what
+    context is available) and matched within a scope by cosine similarity of
+    the user message, so near-duplicate requests reuse a previous decision.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        max_entries_per_scope: int = 256,
+        embedder: Optional[HashedNgramEmbedder] = None,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_scope = max_entries_per_scope
+        self.embedder = embedder or HashedNgramEmbedder()
+        self._scopes: Dict[Hashable, _ScopeIndex] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, scope: Hashable, text: str) -> Optional[Dict]:
+        """Returns a copy of the closest cached value above the threshold"""
+        vector = self.embedder.embed(text)
+        with self._lock:
+            scope_index = self._scopes.get(scope)
+            if scope_index is not None:
+                similarity, position = scope_index.search(vector)
+                if position >= 0 and similarity >= self.similarity_threshold:
+                    self.hits += 1
+                    print(f"🧠 Semantic cache hit (similarity {similarity:.3f})")
+                    return copy.deepcopy(scope_index.values[position])
+            self.misses += 1
+        return None
+
+    def add(self, scope: Hashable, text: str, value: Dict):
+        """Stores a value for the given scope and text"""
+        vector = self.embedder.embed(text)
+        with self._lock:
+            scope_index = self._scopes.get(scope)
+            if scope_index is None:
+                scope_index = _ScopeIndex(self.embedder.dim)
+                self._scopes[scope] = scope_index
+            scope_index.add(vector, copy.deepcopy(value))
+            scope_index.trim(self.max_entries_per_scope)
+
+    def get_stats(self) -> Dict:
+        """Returns hit/miss counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "scopes": len(self._scopes),
+            "entries": sum(len(s.values) for s in self._scopes.values()),
+        }
@@ -42,12 +42,7 @@ class TitleGenerator:
             session_id=session_id,
             messages=prompt_messages,
             purpose="title_generation",
-            # Using a fast and capable model for titling
-            model_fallbacks=[
-                "cohere/command-r-08-2024",
-                "mistralai/mistral-7b-instruct",
-                "openai/gpt-3.5-turbo",
-            ],
+            # Fast titling models come from the title_generation retry policy
             temperature=0.5,
             max_tokens=30,  # Titles are short
         )
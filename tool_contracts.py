@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set
+
+
+@dataclass(frozen=True)
+class ToolContract:
+    """What a tool produces and which of those outputs it consumes"""
+
+    produces: FrozenSet[str] = frozenset()
+    # Taken from the producer in the same batch whenever there is one
+    requires: FrozenSet[str] = frozenset()
+    # Taken from the batch, unless an earlier turn may already provide it
+    accepts: FrozenSet[str] = frozenset()
+    # Optional narrowing of a search; only the user's phrasing says if it applies
+    scoped_by: FrozenSet[str] = frozenset()
+    read_only: bool = True
+
+
+TOOL_CONTRACTS: Dict[str, ToolContract] = {
+    "search_companies": ToolContract(
+        produces=frozenset({"companies"}),
+        scoped_by=frozenset({"contacts"}),
+    ),
+    "search_leads": ToolContract(
+        produces=frozenset({"contacts"}),
+        scoped_by=frozenset({"companies"}),
+    ),
+    "generate_email": ToolContract(produces=frozenset({"email"})),
+    "create_cadence": ToolContract(
+        produces=frozenset({"cadence"}),
+        requires=frozenset({"email"}),
+        accepts=frozenset({"contacts"}),
+        read_only=False,
+    ),
+    "add_contacts_to_cadence": ToolContract(
+        requires=frozenset({"cadence", "contacts"}),
+        read_only=False,
+    ),
+}
+
+READ_ONLY_TOOLS = frozenset(
+    name for name, contract in TOOL_CONTRACTS.items() if contract.read_only
+)
+
+# Which context summary keys mean a resource exists from an earlier turn
+CONTEXT_RESOURCES = {
+    "contacts": ("contact_ids",),
+    "companies": ("company_ids", "company_names"),
+    "email": ("email_content",),
+    "cadence": ("cadence_id",),
+}
+
+
+def _available_resources(context_info: Optional[Dict]) -> Set[str]:
+    summary_data = (context_info or {}).get("summary_data", {})
+    return {
+        resource
+        for resource, keys in CONTEXT_RESOURCES.items()
+        if any(summary_data.get(key) for key in keys)
+    }
+
+
+def infer_dependencies(
+    tool_calls: List[Dict], context_info: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    Derives step dependencies from the tool contracts alone.
+
+    Returns:
+        An analysis in the same shape as the LLM dependency analysis, or None
+        when the contracts cannot decide (unknown or repeated producers, a
+        search that may be scoped by another search in the batch, or an
+        input that an earlier turn may already provide)
+    """
+    tool_names = [call["function"]["name"] for call in tool_calls]
+    if any(name not in TOOL_CONTRACTS for name in tool_names):
+        return None
+    available = _available_resources(context_info)
+
+    producers: Dict[str, List[str]] = {}
+    for i, name in enumerate(tool_names):
+        for resource in TOOL_CONTRACTS[name].produces:
+            producers.setdefault(resource, []).append(f"step_{i}")
+
+    dependencies: Dict[str, Set[str]] = {}
+    for i, name in enumerate(tool_names):
+        step_id = f"step_{i}"
+        contract = TOOL_CONTRACTS[name]
+        deps: Set[str] = set()
+        for resource in contract.requires | contract.accepts | contract.scoped_by:
+            batch_producers = [p for p in producers.get(resource, []) if p != step_id]
+            if not batch_producers:
+                continue
+            if len(batch_producers) > 1 or resource in contract.scoped_by:
+                return None
+            if resource in contract.accepts and resource in available:
+                return None
+            deps.update(batch_producers)
+        dependencies[step_id] = deps
+
+    # Every edge carries a resource, and step results are only injected from
+    # direct dependencies, so edges implied by a longer path are kept too
+    dependencies = {
+        step_id: sorted(deps, key=lambda s: int(s.split("_")[1]))
+        for step_id, deps in dependencies.items()
+        if deps
+    }
+    return {
+        "execution_type": "sequential" if dependencies else "parallel",
+        "reasoning": "Dependencies derived from tool input/output contracts.",
+        "confidence": 1.0,
+        "dependencies": dependencies,
+    }
@@ -207,6 +207,7 @@ class EmailGeneratorTool:
             example (Optional[str]): An optional example
             session_id (Optional[str]): Session ID for tracking
             fallback_models (Optional[list]): List of models to try in order
+                (defaults to the email_generation_fallback retry policy)
 
         Returns:
             Dict[str, Any]: Generated email or error message
@@ -214,14 +215,6 @@ class EmailGeneratorTool:
         if session_id is None:
             session_id = str(uuid.uuid4())
 
-        # Default fallback models
-        if fallback_models is None:
-            fallback_models = [
-                "openai/gpt-4o-mini",
-                "anthropic/claude-3-haiku",
-                "google/gemini-flash-1.5",
-            ]
-
         # Build messages
         user_content_parts = [
             f"Generate an email with the following characteristics:\n",
@@ -254,7 +247,7 @@ class EmailGeneratorTool:
         ]
 
         try:
-            # Use client's retry mechanism with fallback models
+            # Fallback models come from the purpose's retry policy unless given
             response = await self.client.chat_completion_with_retries(
                 session_id=session_id,
                 purpose="email_generation_fallback",
@@ -94,7 +94,11 @@ class CompanySearchTool:
 
         payload = {
             "companySelectedFilters": [],
-            "companyName": match_company_via_api(companyName) if companyName else [],
+            "companyName": (
+                await match_company_via_api(companyName, self.client)
+                if companyName
+                else []
+            ),
             "hqCountry": ensure_list(hqCountry),
             "hqState": ensure_list(hqState),
             "hqCity": hqcities
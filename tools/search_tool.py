@@ -100,7 +100,7 @@ class ContactsSearchTool:
             company_name_list = []
         elif companyName:
             print(f"Raw companyNames input: {companyName}")
-            company_name_list = match_company_via_api(companyName)
+            company_name_list = await match_company_via_api(companyName, self.client)
 
         print(f"🔍 Searching with company names: {len(company_name_list)}")
         print(f"🔍 Searching with company IDs: {len(company_id_list)}")